@@ -0,0 +1,39 @@
+# ===== BANQUE DE GRILLES : LIGNE DE COMMANDE =====
+# Usage : python -m app.bank_cli fill --count 500
+#         python -m app.bank_cli info
+#
+# Module à part : app.puzzle_bank est importé par le paquet (routes), le
+# lancer avec ``python -m`` le chargerait deux fois (RuntimeWarning de runpy).
+
+import argparse
+import logging
+import os
+
+from app.puzzle_bank import DIFFICULTIES, fill_bank, open_bank
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.bank_cli",
+                                     description="Remplit une banque de grilles Sudoku")
+    parser.add_argument("command", choices=["fill", "info"])
+    parser.add_argument("--bank", default=os.environ.get("SUDOKU_BANK_PATH", "puzzles.bank"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 9, 16, 25])
+    parser.add_argument("--difficulties", nargs="+", default=DIFFICULTIES, choices=DIFFICULTIES)
+    parser.add_argument("--count", type=int, default=100, help="grilles par taille et difficulté")
+    args = parser.parse_args(argv)
+
+    if args.command == "fill":
+        logging.getLogger("app.sudoku").setLevel(logging.WARNING)
+        fill_bank(args.bank, args.sizes, args.difficulties, args.count)
+
+    bank = open_bank(args.bank)
+    if bank is None:
+        print(f"❌ Aucune banque : {args.bank}")
+        return
+    for (size, difficulty), (rec_size, count, _) in sorted(bank.sections.items()):
+        print(f"{size}x{size} {difficulty:8} {count:7} grilles ({rec_size} octets)")
+    bank.close()
+
+
+if __name__ == "__main__":
+    main()
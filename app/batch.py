@@ -0,0 +1,208 @@
+# ===== GÉNÉRATION EN MASSE SUR PLUSIEURS CŒURS =====
+# Usage : python -m app.batch generate --sizes 9 16 --count 10000 --out grilles.jsonl
+#         python -m app.batch solve --in grilles.jsonl --out solutions.jsonl
+#
+# Chaque tâche génère un petit lot de grilles dans un processus séparé avec
+# sa propre graine ; les résultats sont écrits au fil de l'eau en JSONL, en
+# une fois à la fin pour la banque binaire, et le débit est affiché par
+# taille. La résolution en masse passe par solve_many (app/batch_solver.py),
+# par paquets de grilles.
+
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from app.batch_solver import solve_many
+from app.puzzle_bank import encode_puzzle, open_bank, write_bank
+from app.sudoku import DIFFICULTY_LEVELS, GRADE_BANDS, Puzzle, generate_puzzle
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    """Initialisation d'un worker : logs du générateur coupés"""
+    logging.getLogger("app.sudoku").setLevel(logging.WARNING)
+
+
+def _generate_chunk(difficulty, size, count, seed, unique):
+    """Tâche exécutée dans un worker : ``count`` grilles avec une graine dédiée"""
+    random.seed(seed)
+    puzzles = []
+    for _ in range(count):
+        puzzle = generate_puzzle(difficulty, size, unique=unique)
+        # Niveau réellement obtenu (peut différer de celui demandé, voir generate_puzzle)
+        puzzles.append((puzzle.grid, puzzle.solution, puzzle.difficulty))
+    return size, puzzles
+
+
+class JsonlSink:
+    """Écrit une grille par ligne JSON, immédiatement"""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def add(self, puzzle):
+        self._file.write(json.dumps({"size": puzzle.size, "difficulty": puzzle.difficulty,
+                                     "grid": puzzle.grid, "solution": puzzle.solution}) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class BankSink:
+    """Ajoute les grilles à une banque binaire, écrite une seule fois à la fermeture
+
+    Les enregistrements (taille fixe) restent en mémoire : réécrire la banque
+    à chaque point de contrôle coûterait O(N²) en entrées/sorties.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sections = {}
+        existing = open_bank(path)
+        if existing is not None:
+            self.sections = existing.read_records()
+            existing.close()
+
+    def add(self, puzzle):
+        self.sections.setdefault((puzzle.size, puzzle.difficulty), []).append(encode_puzzle(puzzle))
+
+    def close(self):
+        write_bank(self.path, self.sections)
+
+
+def generate_batch(sink, sizes, difficulties, count, workers=None, chunk=10, seed=None, unique=True):
+    """Génère ``count`` grilles par (taille, difficulté) sur un pool de processus
+
+    Returns:
+        dict: taille -> {"puzzles", "seconds", "per_second"}
+    """
+    master = random.Random(seed)
+    tasks = []
+    for size in sizes:
+        for difficulty in difficulties:
+            if difficulty not in DIFFICULTY_LEVELS.get(size, []):
+                continue
+            for start in range(0, count, chunk):
+                tasks.append((difficulty, size, min(chunk, count - start), master.getrandbits(64), unique))
+
+    workers = workers or os.cpu_count() or 1
+    done_per_size = {size: 0 for size in sizes}
+    first_submit = {}
+    last_done = {}
+    start_time = time.time()
+    last_report = start_time
+
+    # ✅ Interruption (Ctrl+C) : les grilles déjà reçues sont tout de même écrites
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = set()
+            next_task = 0
+            # ✅ Fenêtre bornée de tâches en vol : mémoire constante même pour 100 000 grilles
+            while next_task < len(tasks) or pending:
+                while next_task < len(tasks) and len(pending) < workers * 2:
+                    pending.add(pool.submit(_generate_chunk, *tasks[next_task]))
+                    first_submit.setdefault(tasks[next_task][1], time.time())
+                    next_task += 1
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                now = time.time()
+                for future in completed:
+                    size, puzzles = future.result()
+                    for grid, solution, difficulty in puzzles:
+                        sink.add(Puzzle(grid, solution, difficulty, size))
+                    done_per_size[size] += len(puzzles)
+                    last_done[size] = now
+                if now - last_report >= 5:
+                    last_report = now
+                    logger.info("⏱️ " + ", ".join(f"{size}x{size}: {n}" for size, n in done_per_size.items()))
+    finally:
+        sink.close()
+
+    report = {}
+    for size, done in done_per_size.items():
+        seconds = last_done.get(size, start_time) - first_submit.get(size, start_time)
+        report[size] = {"puzzles": done, "seconds": round(seconds, 2),
+                        "per_second": round(done / seconds, 1) if seconds > 0 else None}
+    return report
+
+
+def solve_file(in_path, out_path, chunk=5000):
+    """Résout les grilles d'un fichier JSONL (clé "grid") par paquets de ``chunk``
+
+    Chaque ligne est recopiée avec sa clé "solution" (null si la grille n'a
+    pas de solution).
+
+    Returns:
+        dict: compteurs de ``solve_many`` cumulés, "grids", "seconds", "per_second"
+    """
+    totals = {"grids": 0, "propagated": 0, "searched": 0, "unsolvable": 0}
+    start_time = time.time()
+
+    def flush(entries, out):
+        stats = {}
+        solutions = solve_many([entry["grid"] for entry in entries], stats)
+        for entry, solution in zip(entries, solutions):
+            out.write(json.dumps({**entry, "solution": solution}) + "\n")
+        totals["grids"] += len(entries)
+        for key, value in stats.items():
+            totals[key] += value
+
+    with open(in_path, encoding="utf-8") as source, open(out_path, "w", encoding="utf-8") as out:
+        entries = []
+        for line in source:
+            if line.strip():
+                entries.append(json.loads(line))
+            if len(entries) >= chunk:
+                flush(entries, out)
+                entries = []
+        if entries:
+            flush(entries, out)
+
+    seconds = time.time() - start_time
+    totals["seconds"] = round(seconds, 2)
+    totals["per_second"] = round(totals["grids"] / seconds, 1) if seconds > 0 else None
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.batch",
+                                     description="Génération et résolution de grilles Sudoku en masse")
+    parser.add_argument("command", choices=["generate", "solve"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9])
+    parser.add_argument("--difficulties", nargs="+", choices=list(GRADE_BANDS), default=list(GRADE_BANDS))
+    parser.add_argument("--count", type=int, default=1000, help="grilles par taille et difficulté")
+    parser.add_argument("--workers", type=int, default=None, help="processus (défaut : nombre de cœurs)")
+    parser.add_argument("--chunk", type=int, default=10, help="grilles par tâche")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--format", choices=["jsonl", "bank"], default="jsonl")
+    parser.add_argument("--out", default=None, help="fichier de sortie (grilles.jsonl / puzzles.bank)")
+    parser.add_argument("--in", dest="source", default="grilles.jsonl", help="grilles à résoudre (solve)")
+    parser.add_argument("--non-unique", action="store_true", help="ancien mode de génération")
+    args = parser.parse_args(argv)
+
+    if args.command == "solve":
+        report = solve_file(args.source, args.out or "solutions.jsonl")
+        print(f"✅ {report['grids']} grilles résolues en {report['seconds']}s ({report['per_second']} grilles/s) : "
+              f"{report['propagated']} par propagation, {report['searched']} avec recherche, "
+              f"{report['unsolvable']} sans solution")
+        return
+
+    if args.format == "bank":
+        sink = BankSink(args.out or os.environ.get("SUDOKU_BANK_PATH", "puzzles.bank"))
+    else:
+        sink = JsonlSink(args.out or "grilles.jsonl")
+
+    report = generate_batch(sink, args.sizes, args.difficulties, args.count, workers=args.workers,
+                            chunk=args.chunk, seed=args.seed, unique=not args.non_unique)
+    for size, stats in report.items():
+        print(f"✅ {size}x{size} : {stats['puzzles']} grilles en {stats['seconds']}s "
+              f"({stats['per_second']} grilles/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# ===== RÉSOLUTION PAR LOTS (NUMPY) =====
+# Pour vérifier ou noter hors ligne des milliers de grilles : les grilles
+# d'une même taille sont empilées dans un tableau (N, n*n) et la propagation
+# (singletons nus et cachés) avance sur tout le lot à la fois, en opérations
+# vectorisées sur les masques de candidats. Les grilles que la propagation
+# ne termine pas sont explorées en largeur, elles aussi en lot ; seules
+# celles dont le front d'exploration devient trop large passent par le
+# solveur DLX, une à une.
+#
+# NumPy est optionnel : sans lui, solve_many résout les grilles une à une.
+
+import logging
+
+from app.sudoku import DancingLinksSolver, _grid_geometry
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Éléments au plus dans le plus gros tableau temporaire d'un passage (mémoire bornée)
+SCAN_BUDGET = 1 << 24
+
+_LAYOUT_CACHE = {}
+
+
+def _layout(size):
+    """Cases de chaque unité (3n, n) et unités de chaque case (n*n, 3), en tableaux"""
+    if size not in _LAYOUT_CACHE:
+        units_of, unit_cells, _ = _grid_geometry(size)
+        _LAYOUT_CACHE[size] = (np.array(unit_cells, dtype=np.intp), np.array(units_of, dtype=np.intp))
+    return _LAYOUT_CACHE[size]
+
+
+def _chunk_rows(size):
+    """Grilles traitées par passage : le tableau (A, 3n, n, n) des singletons cachés tient dans le budget"""
+    return max(1, SCAN_BUDGET // (3 * size ** 3))
+
+
+def _popcount(x):
+    """Nombre de bits à 1 de chaque masque (uint32)"""
+    x = x - ((x >> 1) & 0x55555555)
+    x = (x & 0x33333333) + ((x >> 2) & 0x33333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F
+    return (x * 0x01010101) >> 24
+
+
+def _scan(vals, size):
+    """Candidats, placements forcés (singletons nus et cachés) et contradictions d'un lot
+
+    Returns:
+        tuple: (candidats (A, n*n), placements (A, n*n), contradictions (A,))
+    """
+    unit_cells, units_of = _layout(size)
+    full = np.uint32((1 << size) - 1)
+    one = np.uint32(1)
+    digits = np.arange(size, dtype=np.uint32)
+    empty = vals == 0
+    bits = np.where(empty, 0, one << (np.maximum(vals, 1) - 1).astype(np.uint32)).astype(np.uint32)
+
+    # Chiffres placés par unité ; un doublon se voit au nombre de bits
+    unit_bits = bits[:, unit_cells]
+    used = np.bitwise_or.reduce(unit_bits, axis=2)
+    broken = (_popcount(used) != (unit_bits != 0).sum(axis=2)).any(axis=1)
+
+    cand = full & ~(used[:, units_of[:, 0]] | used[:, units_of[:, 1]] | used[:, units_of[:, 2]])
+    cand[~empty] = 0
+    broken |= (empty & (cand == 0)).any(axis=1)
+
+    # ✅ Singletons nus : un seul candidat
+    placed = np.zeros_like(vals)
+    naked = empty & (cand != 0) & ((cand & (cand - one)) == 0)
+    placed[naked] = _popcount(cand[naked] - one) + 1
+
+    # ✅ Singletons cachés : un chiffre absent de l'unité n'a plus qu'une place
+    has = ((cand[:, :, None] >> digits) & one).astype(np.uint8)[:, unit_cells]  # (A, 3n, n, chiffres)
+    count = has.sum(axis=2)
+    missing = ((used[:, :, None] >> digits) & one) == 0
+    broken |= (missing & (count == 0)).any(axis=(1, 2))
+    grid_idx, unit_idx, digit_idx = np.nonzero(missing & (count == 1))
+    if len(grid_idx):
+        cells = unit_cells[unit_idx, has[grid_idx, unit_idx, :, digit_idx].argmax(axis=1)]
+        placed[grid_idx, cells] = digit_idx + 1
+    return cand, placed, broken
+
+
+def propagate_many(values, size):
+    """Singletons nus et cachés sur tout un lot, jusqu'au point fixe
+
+    Args:
+        values: tableau (N, n*n) des chiffres (0 = vide), complété en place
+        size (int): taille des grilles
+
+    Returns:
+        tableau booléen (N,) : grilles contradictoires (sans solution)
+    """
+    dead = np.zeros(len(values), dtype=bool)
+    step = _chunk_rows(size)
+    for start in range(0, len(values), step):
+        chunk, chunk_dead = values[start:start + step], dead[start:start + step]  # Vues
+        active = np.arange(len(chunk))
+        while len(active):
+            vals = chunk[active]
+            _, placed, broken = _scan(vals, size)
+            progress = (placed != 0).any(axis=1) & ~broken
+            chunk[active] = np.where(placed != 0, placed, vals)
+            chunk_dead[active[broken]] = True
+            active = active[progress]
+    return dead
+
+
+def search_many(values, size, max_rows=None, max_branches=64):
+    """Recherche en largeur vectorisée sur des grilles propagées mais incomplètes
+
+    À chaque tour, chaque grille du front est déclinée sur les candidats de
+    sa case la plus contrainte, puis tout le front est propagé d'un coup.
+
+    Args:
+        values: tableau (M, n*n) de grilles au point fixe de la propagation
+        max_rows (int): taille de front au-delà de laquelle on abandonne
+            (défaut : quatre passages de propagation)
+        max_branches (int): branches ouvertes au plus par grille ; au-delà,
+            la grille est abandonnée (trop peu contrainte pour un parcours en largeur)
+
+    Returns:
+        tuple: (dict grille -> solution (n*n,), ensemble des grilles abandonnées) ;
+        les grilles absentes des deux n'ont pas de solution
+    """
+    max_rows = max_rows or 4 * _chunk_rows(size)
+    solutions = {}
+    gave_up = set()
+    frontier = values
+    owners = np.arange(len(values))
+    while len(frontier):
+        if len(frontier) > max_rows:
+            return solutions, gave_up | set(owners.tolist())
+        cand, _, _ = _scan(frontier, size)
+        options = np.where(cand == 0, size + 1, _popcount(cand).astype(np.int32))
+        cell = options.argmin(axis=1)
+        masks = cand[np.arange(len(frontier)), cell]
+
+        children, child_owners = [], []
+        for d in range(size):
+            rows = np.nonzero((masks >> np.uint32(d)) & np.uint32(1))[0]
+            if len(rows):
+                child = frontier[rows].copy()
+                child[np.arange(len(rows)), cell[rows]] = d + 1
+                children.append(child)
+                child_owners.append(owners[rows])
+        frontier = np.concatenate(children)
+        owners = np.concatenate(child_owners)
+
+        alive = ~propagate_many(frontier, size)
+        complete = alive & (frontier != 0).all(axis=1)
+        for row in np.nonzero(complete)[0]:
+            solutions.setdefault(int(owners[row]), frontier[row])
+        # Les grilles déjà résolues quittent le front
+        open_rows = alive & ~complete & ~np.isin(owners, list(solutions))
+        frontier, owners = frontier[open_rows], owners[open_rows]
+
+        wide = np.nonzero(np.bincount(owners, minlength=len(values)) > max_branches)[0]
+        if len(wide):
+            gave_up.update(wide.tolist())
+            keep = ~np.isin(owners, wide)
+            frontier, owners = frontier[keep], owners[keep]
+    return solutions, gave_up
+
+
+def _solve_one(board):
+    """Repli grille par grille (DLX) ; retourne la grille résolue ou None"""
+    board = [row[:] for row in board]
+    return board if DancingLinksSolver(board).solve() else None
+
+
+def solve_many(grids, stats=None):
+    """Résout un lot de grilles (tailles mélangées possibles), sans les modifier
+
+    Args:
+        grids: liste de grilles (listes de listes, 0 = case vide)
+        stats (dict): si fourni, reçoit ``propagated`` (résolues par la seule
+            propagation), ``searched`` (passées au solveur) et ``unsolvable``
+
+    Returns:
+        list: grille résolue ou None (sans solution), dans l'ordre des entrées
+    """
+    counters = {"propagated": 0, "searched": 0, "unsolvable": 0}
+    results = [None] * len(grids)
+
+    if np is None:
+        logger.info("⚠️ NumPy absent : résolution grille par grille")
+        for k, grid in enumerate(grids):
+            results[k] = _solve_one(grid)
+            counters["searched"] += 1
+            counters["unsolvable"] += results[k] is None
+    else:
+        by_size = {}
+        for k, grid in enumerate(grids):
+            by_size.setdefault(len(grid), []).append(k)
+        for size, indices in by_size.items():
+            values = np.array([grids[k] for k in indices], dtype=np.int32).reshape(len(indices), size * size)
+            dead = propagate_many(values, size)
+            done = (values != 0).all(axis=1) & ~dead
+            open_rows = np.nonzero(~done & ~dead)[0]
+            found, gave_up = search_many(values[open_rows], size) if len(open_rows) else ({}, set())
+            for row, k in enumerate(indices):
+                if done[row]:
+                    results[k] = values[row].reshape(size, size).tolist()
+                    counters["propagated"] += 1
+            for pos, row in enumerate(open_rows):
+                k = indices[row]
+                counters["searched"] += 1
+                if pos in found:
+                    results[k] = found[pos].reshape(size, size).tolist()
+                elif pos in gave_up:
+                    # Front trop large : la recherche DLX repart de la grille propagée
+                    results[k] = _solve_one(values[row].reshape(size, size).tolist())
+            counters["unsolvable"] += sum(1 for k in indices if results[k] is None)
+
+    if stats is not None:
+        stats.update(counters)
+    return results
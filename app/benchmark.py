@@ -0,0 +1,312 @@
+# ===== BANC D'ESSAI DES SOLVEURS =====
+# Usage :
+#   python -m app.benchmark run --out bench.json --corpus bench_corpus.json
+#   python -m app.benchmark compare bench_avant.json bench_apres.json
+#
+# Le corpus (grilles générées avec une graine fixe + grilles 9x9 réputées
+# difficiles) est enregistré dans un fichier JSON pour que deux commits
+# soient mesurés sur exactement les mêmes grilles.
+
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import math
+import platform
+import random
+import signal
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from app.sudoku import (
+    DIFFICULTY_LEVELS,
+    SOLVER_BACKENDS,
+    DancingLinksSolver,
+    UltraSudokuSolver,
+    generate_puzzle,
+    solve_sudoku,
+    solve_sudoku_classic_fast_check,
+    solve_sudoku_classic_optimized,
+    solve_sudoku_verification,
+)
+
+# Grilles 9x9 classiques connues pour mettre les solveurs en difficulté
+KNOWN_HARD_9X9 = {
+    "ai_escargot": "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    "inkala_2010": "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "easter_monster": "1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1",
+    "top95_001": "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "top95_002": "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    "top95_003": "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+    "min17_001": ".......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6...",
+}
+
+# Points d'entrée mesurés : nom -> (fonction(board), taille maximale raisonnable)
+ENTRY_POINTS = {
+    "solve_sudoku": (solve_sudoku, 25),
+    "solve_sudoku_verification": (solve_sudoku_verification, 25),
+    "solve_sudoku_classic_fast_check": (solve_sudoku_classic_fast_check, 9),
+    "UltraSudokuSolver.solve": (lambda board: UltraSudokuSolver(board).solve(), 25),
+}
+for _name, _backend in SOLVER_BACKENDS.items():
+    ENTRY_POINTS[f"backend:{_name}"] = (_backend, 9 if _name == "classic" else 25)
+
+
+def _search_codes():
+    """Objets code des fonctions récursives dont chaque appel = un noeud exploré"""
+    codes = {
+        UltraSudokuSolver._backtrack_ultra_fast.__code__,
+        DancingLinksSolver._select.__code__,
+    }
+    for func in (solve_sudoku_classic_optimized, solve_sudoku_classic_fast_check):
+        codes.update(const for const in func.__code__.co_consts
+                     if hasattr(const, "co_name") and const.co_name in ("solve", "solve_fast"))
+    return codes
+
+
+def parse_grid(text):
+    """Grille 9x9 au format 81 caractères ('.' ou '0' = case vide)"""
+    return [[0 if ch in ".0" else int(ch) for ch in text[r * 9:r * 9 + 9]] for r in range(9)]
+
+
+def build_corpus(seed=1234, per_level=10, sizes=(4, 9, 16, 25)):
+    """Corpus reproductible : grilles uniques par (taille, difficulté) + 9x9 difficiles"""
+    random.seed(seed)
+    corpus = []
+    for size in sizes:
+        for difficulty in DIFFICULTY_LEVELS[size]:
+            for i in range(per_level):
+                puzzle = generate_puzzle(difficulty, size, unique=True)
+                corpus.append({"name": f"{size}x{size}-{difficulty}-{i:03d}", "size": size,
+                               "difficulty": difficulty, "grid": puzzle.grid})
+    if 9 in sizes:
+        for name, text in KNOWN_HARD_9X9.items():
+            corpus.append({"name": name, "size": 9, "difficulty": "known-hard", "grid": parse_grid(text)})
+    return corpus
+
+
+def corpus_hash(corpus):
+    data = json.dumps([entry["grid"] for entry in corpus], separators=(",", ":")).encode()
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def percentile(sorted_values, pct):
+    """Percentile au rang le plus proche"""
+    if not sorted_values:
+        return None
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class BenchTimeout(Exception):
+    """Levée quand une résolution dépasse le budget de temps du banc d'essai"""
+
+
+def _on_alarm(signum, frame):
+    raise BenchTimeout()
+
+
+def _call_with_budget(func, board, budget):
+    """Appelle ``func(board)`` ; lève BenchTimeout après ``budget`` secondes (Unix)"""
+    if not budget or not hasattr(signal, "setitimer"):
+        return func(board)
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        return func(board)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _profile_run(func, grid, search_codes, budget):
+    """Exécution instrumentée (non chronométrée) : noeuds explorés et pic mémoire"""
+    nodes = 0
+
+    def profiler(frame, event, arg):
+        nonlocal nodes
+        if event == "call" and frame.f_code in search_codes:
+            nodes += 1
+
+    board = copy.deepcopy(grid)
+    tracemalloc.start()
+    sys.setprofile(profiler)
+    try:
+        _call_with_budget(func, board, budget)
+    except BenchTimeout:
+        nodes = None
+    finally:
+        sys.setprofile(None)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return nodes, peak
+
+
+def run_benchmark(corpus, entries=None, repeat=1, profile=True, budget=10.0):
+    """Mesure chaque point d'entrée sur chaque groupe (taille, difficulté) du corpus
+
+    Une résolution qui dépasse ``budget`` secondes est interrompue et comptée
+    dans ``timeouts`` avec une latence égale au budget (valeur censurée).
+    """
+    logging.getLogger("app.sudoku").setLevel(logging.WARNING)
+    search_codes = _search_codes()
+    groups = {}
+    for entry in corpus:
+        groups.setdefault((entry["size"], entry["difficulty"]), []).append(entry)
+
+    results = {}
+    for name, (func, max_size) in ENTRY_POINTS.items():
+        if entries and name not in entries:
+            continue
+        for (size, difficulty), puzzles in sorted(groups.items()):
+            if size > max_size:
+                continue
+            timings, nodes, peaks = [], [], []
+            solved = timeouts = 0
+            for entry in puzzles:
+                ok = False
+                for _ in range(repeat):
+                    board = copy.deepcopy(entry["grid"])
+                    start = time.perf_counter()
+                    try:
+                        ok = _call_with_budget(func, board, budget)
+                    except BenchTimeout:
+                        ok = None
+                    timings.append(time.perf_counter() - start)
+                if ok is None:
+                    timeouts += 1
+                    continue  # Inutile de l'instrumenter : elle dépasserait encore le budget
+                solved += bool(ok)
+                if profile:
+                    node_count, peak = _profile_run(func, entry["grid"], search_codes, budget)
+                    if node_count is not None:
+                        nodes.append(node_count)
+                    peaks.append(peak)
+
+            timings.sort()
+            nodes.sort()
+            key = f"{name}|{size}x{size}|{difficulty}"
+            results[key] = {
+                "puzzles": len(puzzles),
+                "solved": solved,
+                "timeouts": timeouts,
+                "p50_ms": round(percentile(timings, 50) * 1000, 3),
+                "p95_ms": round(percentile(timings, 95) * 1000, 3),
+                "p99_ms": round(percentile(timings, 99) * 1000, 3),
+                "max_ms": round(timings[-1] * 1000, 3),
+                "nodes_p50": percentile(nodes, 50),
+                "nodes_p95": percentile(nodes, 95),
+                "nodes_max": nodes[-1] if nodes else None,
+                "peak_kib": round(max(peaks) / 1024, 1) if peaks else None,
+            }
+            print(f"{key:60} p50 {results[key]['p50_ms']:>9.2f} ms   p95 {results[key]['p95_ms']:>9.2f} ms   "
+                  f"p99 {results[key]['p99_ms']:>9.2f} ms   {solved}/{len(puzzles)}"
+                  + (f"   ⏱️ {timeouts} hors budget" if timeouts else ""))
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base, current, threshold=1.25, min_ms=0.5):
+    """Liste les régressions entre deux rapports
+
+    Régression = p95 ou noeuds explorés (p50) multipliés par plus de
+    ``threshold``, ou moins de grilles résolues qu'avant.
+    """
+    if base["meta"].get("corpus") != current["meta"].get("corpus"):
+        print("⚠️ Corpus différents : comparaison indicative seulement")
+    regressions = []
+    for key, stats in sorted(current["results"].items()):
+        old = base["results"].get(key)
+        if old is None:
+            print(f"{key:60} (nouveau)")
+            continue
+        ratio = stats["p95_ms"] / old["p95_ms"] if old["p95_ms"] else float("inf")
+        reasons = []
+        if ratio > threshold and stats["p95_ms"] > min_ms:
+            reasons.append("p95")
+        if old.get("nodes_p50") and stats.get("nodes_p50") and stats["nodes_p50"] > old["nodes_p50"] * threshold:
+            reasons.append("noeuds")
+        if old["solved"] > stats["solved"]:
+            reasons.append("grilles résolues")
+        if reasons:
+            regressions.append(key)
+            flag = "❌ RÉGRESSION (" + ", ".join(reasons) + ")"
+        else:
+            flag = "✅" if ratio < 1 / threshold else ""
+        print(f"{key:60} p95 {old['p95_ms']:>9.2f} -> {stats['p95_ms']:>9.2f} ms (x{ratio:.2f}) {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des solveurs Sudoku")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run")
+    run_parser.add_argument("--out", default="bench.json")
+    run_parser.add_argument("--corpus", default=None, help="fichier corpus (créé s'il n'existe pas)")
+    run_parser.add_argument("--seed", type=int, default=1234)
+    run_parser.add_argument("--per-level", type=int, default=10)
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[4, 9, 16, 25])
+    run_parser.add_argument("--entries", nargs="+", default=None, choices=list(ENTRY_POINTS))
+    run_parser.add_argument("--repeat", type=int, default=1)
+    run_parser.add_argument("--no-profile", action="store_true", help="sans comptage des noeuds ni mémoire")
+    run_parser.add_argument("--budget", type=float, default=10.0, help="secondes max par résolution (0 = illimité)")
+
+    cmp_parser = sub.add_parser("compare")
+    cmp_parser.add_argument("base")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--threshold", type=float, default=1.25)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        sys.exit(1 if compare(base, current, args.threshold) else 0)
+
+    corpus = None
+    if args.corpus:
+        try:
+            with open(args.corpus, encoding="utf-8") as f:
+                corpus = json.load(f)
+        except FileNotFoundError:
+            pass
+    if corpus is None:
+        logging.getLogger("app.sudoku").setLevel(logging.WARNING)
+        corpus = build_corpus(args.seed, args.per_level, args.sizes)
+        if args.corpus:
+            with open(args.corpus, "w", encoding="utf-8") as f:
+                json.dump(corpus, f)
+    corpus = [entry for entry in corpus if entry["size"] in args.sizes]
+
+    results = run_benchmark(corpus, args.entries, args.repeat, profile=not args.no_profile, budget=args.budget)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "corpus": corpus_hash(corpus),
+            "puzzles": len(corpus),
+            "budget_s": args.budget,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"✅ Résultats écrits dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,243 +1,242 @@
 # ===== SYSTÈME D'IMPRESSION HTML REDESSINÉ COMPLÈTEMENT =====
 # Fichier: print_system_new.py
+#
+# Rendu en flux : l'enveloppe de la page est compilée une fois par
+# (taille, solution ?) et les lignes de la grille sont produites par un
+# générateur. Les routes renvoient ce générateur dans une Response Flask :
+# mémoire constante et premier octet envoyé tout de suite.
+#
+# Le CSS et la configuration de chaque taille sont précalculés à l'import
+# et servis à part (/print-css, /print-config) avec ETag et Cache-Control :
+# la page ne fait que lier la feuille de style, versionnée par son empreinte.
 
-def create_sudoku_print_page(grid_data, size, difficulty, is_solution=False):
-    """
-    Redessine complètement les grilles pour l'impression en HTML pur
+import hashlib
+from html import escape
+
+# Configuration par taille - REDESSINÉE
+PRINT_CONFIGS = {
+    4: {"cell": "15mm", "font": "16pt", "thin": "1mm solid #333", "thick": "3mm solid #000"},
+    9: {"cell": "12mm", "font": "14pt", "thin": "0.8mm solid #333", "thick": "2.5mm solid #000"},
+    16: {"cell": "8mm", "font": "11pt", "thin": "0.6mm solid #333", "thick": "2mm solid #000"},
+    25: {"cell": "6mm", "font": "8pt", "thin": "0.4mm solid #333", "thick": "1.5mm solid #000"}
+}
+
+# Marqueurs remplacés au rendu (niveau) ou par le flux des lignes
+_LEVEL = "\x00LEVEL\x00"
+_ROWS = "\x00ROWS\x00"
+
+_SHELL_CACHE = {}
+_CELL_CACHE = {}
+
+
+def _build_print_css(size):
+    """CSS complet redessiné pour une taille de grille"""
+    config = PRINT_CONFIGS[size]
+    return f"""
+    /* RESET COMPLET */
+    * {{
+        margin: 0;
+        padding: 0;
+        box-sizing: border-box;
+        -webkit-print-color-adjust: exact;
+        print-color-adjust: exact;
+    }}
     
-    Args:
-        grid_data (list): Grille 2D avec 0 pour cases vides
-        size (int): Taille de la grille
-        difficulty (str): Niveau de difficulté
-        is_solution (bool): True si c'est une solution
+    /* PAGE CONFIGURATION */
+    @page {{
+        size: A4;
+        margin: 12mm;
+    }}
     
-    Returns:
-        str: Page HTML complète optimisée pour impression
-    """
+    html, body {{
+        width: 100%;
+        height: 100%;
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        background: white;
+        color: black;
+    }}
+    
+    /* CONTAINER PRINCIPAL */
+    .print-container {{
+        width: 100%;
+        max-width: 190mm;
+        margin: 0 auto;
+        padding: 5mm;
+        text-align: center;
+    }}
+    
+    /* TITRE */
+    .sudoku-title {{
+        font-size: 18pt;
+        font-weight: bold;
+        color: #000;
+        margin-bottom: 8mm;
+        text-align: center;
+    }}
     
-    # Configuration par taille - REDESSINÉE
-    print_configs = {
-        4: {"cell": "15mm", "font": "16pt", "thin": "1mm solid #333", "thick": "3mm solid #000"},
-        9: {"cell": "12mm", "font": "14pt", "thin": "0.8mm solid #333", "thick": "2.5mm solid #000"},
-        16: {"cell": "8mm", "font": "11pt", "thin": "0.6mm solid #333", "thick": "2mm solid #000"},
-        25: {"cell": "6mm", "font": "8pt", "thin": "0.4mm solid #333", "thick": "1.5mm solid #000"}
-    }
+    /* WRAPPER DE LA GRILLE */
+    .sudoku-grid-wrapper {{
+        display: inline-block;
+        border: 3mm solid #000;
+        background: white;
+        margin: 0 auto;
+    }}
     
-    config = print_configs.get(size, print_configs[9])
-    block_size = int(size ** 0.5)
+    /* TABLE DE LA GRILLE */
+    .sudoku-table {{
+        border-collapse: collapse;
+        border-spacing: 0;
+        width: auto;
+        height: auto;
+        background: white;
+    }}
     
-    # Génération de la grille HTML - REDESSINÉE
-    def generate_grid_html():
-        html_rows = []
+    /* CELLULES DE BASE */
+    .sudoku-cell {{
+        width: {config['cell']};
+        height: {config['cell']};
+        min-width: {config['cell']};
+        min-height: {config['cell']};
+        max-width: {config['cell']};
+        max-height: {config['cell']};
         
-        for row_idx in range(size):
-            row_cells = []
-            
-            for col_idx in range(size):
-                cell_value = grid_data[row_idx][col_idx]
-                
-                # Classes CSS pour bordures de blocs
-                css_classes = ["sudoku-cell"]
-                
-                # Bordures de blocs
-                if row_idx % block_size == 0:
-                    css_classes.append("border-top-thick")
-                if col_idx % block_size == 0:
-                    css_classes.append("border-left-thick")
-                if row_idx == size - 1:
-                    css_classes.append("border-bottom-thick")
-                if col_idx == size - 1:
-                    css_classes.append("border-right-thick")
-                
-                # Contenu de la cellule - UNIFIÉ
-                if cell_value == 0:
-                    # Case vide - même traitement pour grille vide et solution
-                    cell_content = ""  # Complètement vide
-                else:
-                    # Case remplie - conversion en symbole
-                    if cell_value <= 9:
-                        cell_content = str(cell_value)
-                    else:
-                        # A=10, B=11, etc.
-                        cell_content = chr(ord('A') + cell_value - 10)
-                
-                # Construction de la cellule
-                classes_str = " ".join(css_classes)
-                row_cells.append(f'<td class="{classes_str}">{cell_content}</td>')
-            
-            # Construction de la ligne
-            html_rows.append(f'<tr>{"".join(row_cells)}</tr>')
+        font-size: {config['font']};
+        font-weight: bold;
+        font-family: 'Segoe UI', Arial, sans-serif;
+        
+        text-align: center;
+        vertical-align: middle;
+        
+        border: {config['thin']};
+        background: white;
+        color: #000;
         
-        return "\n".join(html_rows)
+        line-height: {config['cell']};
+        padding: 0;
+        margin: 0;
+    }}
     
-    # Type de grille pour le titre
+    /* BORDURES ÉPAISSES POUR BLOCS */
+    .border-top-thick {{
+        border-top: {config['thick']} !important;
+    }}
+    
+    .border-left-thick {{
+        border-left: {config['thick']} !important;
+    }}
+    
+    .border-bottom-thick {{
+        border-bottom: {config['thick']} !important;
+    }}
+    
+    .border-right-thick {{
+        border-right: {config['thick']} !important;
+    }}
+    
+    /* FOOTER */
+    .sudoku-footer {{
+        margin-top: 8mm;
+        font-size: 10pt;
+        color: #666;
+        text-align: center;
+    }}
+    
+    /* STYLES D'IMPRESSION SPÉCIFIQUES */
+    @media print {{
+        .print-container {{
+            max-width: none;
+            width: 100%;
+        }}
+        
+        /* Forcer les couleurs */
+        .sudoku-cell {{
+            -webkit-print-color-adjust: exact !important;
+            print-color-adjust: exact !important;
+            color: #000 !important;
+            background: white !important;
+        }}
+        
+        /* Optimisations par taille */
+        {f'''
+        .sudoku-cell {{
+            font-size: {config['font']} !important;
+            width: {config['cell']} !important;
+            height: {config['cell']} !important;
+            border: {config['thin']} !important;
+        }}
+        ''' if size <= 16 else f'''
+        .sudoku-cell {{
+            font-size: {config['font']} !important;
+            width: {config['cell']} !important;
+            height: {config['cell']} !important;
+            border: 0.5mm solid #000 !important;
+        }}
+        .border-top-thick {{ border-top: 2mm solid #000 !important; }}
+        .border-left-thick {{ border-left: 2mm solid #000 !important; }}
+        .border-bottom-thick {{ border-bottom: 2mm solid #000 !important; }}
+        .border-right-thick {{ border-right: 2mm solid #000 !important; }}
+        '''}
+    }}
+"""
+
+
+# ✅ CSS, configuration et ETag précalculés une fois par taille, à l'import
+_PRINT_ASSETS = {}
+for _size, _config in PRINT_CONFIGS.items():
+    _css = _build_print_css(_size)
+    _PRINT_ASSETS[_size] = (_css, hashlib.sha1(_css.encode("utf-8")).hexdigest()[:16])
+
+
+def get_print_config(size):
+    """Configuration d'impression d'une taille (copie), avec la taille des blocs"""
+    config = PRINT_CONFIGS.get(size, PRINT_CONFIGS[9])
+    return {**config, "size": size if size in PRINT_CONFIGS else 9, "block_size": int(size ** 0.5)}
+
+
+def generate_print_css(size, difficulty=None):
+    """CSS d'impression précalculé d'une taille (identique pour tous les niveaux)"""
+    return _PRINT_ASSETS.get(size, _PRINT_ASSETS[9])[0]
+
+
+def get_print_etag(size):
+    """Empreinte du CSS d'une taille : ETag et paramètre de version de l'URL"""
+    return _PRINT_ASSETS.get(size, _PRINT_ASSETS[9])[1]
+
+
+def _compile_shell(size, is_solution):
+    """Enveloppe HTML de la page, découpée autour du niveau et des lignes
+
+    Returns:
+        tuple: (début jusqu'au niveau, suite jusqu'aux lignes, fin de page)
+    """
+    key = (size, is_solution)
+    if key in _SHELL_CACHE:
+        return _SHELL_CACHE[key]
+
+    # Type de grille pour le titre ; taille inconnue : feuille de style du 9x9
+    css_size = size if size in PRINT_CONFIGS else 9
     grid_type = "Solution du" if is_solution else "Grille de"
     
-    # CSS complet redessiné
-    css_styles = f"""
+    # Page redessinée ; le CSS est une ressource à part, mise en cache par le navigateur
+    page = f"""
     <!DOCTYPE html>
     <html lang="fr">
     <head>
         <meta charset="UTF-8">
         <title>{grid_type} Sudoku {size}x{size}</title>
-        <style>
-            /* RESET COMPLET */
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-                -webkit-print-color-adjust: exact;
-                print-color-adjust: exact;
-            }}
-            
-            /* PAGE CONFIGURATION */
-            @page {{
-                size: A4;
-                margin: 12mm;
-            }}
-            
-            html, body {{
-                width: 100%;
-                height: 100%;
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background: white;
-                color: black;
-            }}
-            
-            /* CONTAINER PRINCIPAL */
-            .print-container {{
-                width: 100%;
-                max-width: 190mm;
-                margin: 0 auto;
-                padding: 5mm;
-                text-align: center;
-            }}
-            
-            /* TITRE */
-            .sudoku-title {{
-                font-size: 18pt;
-                font-weight: bold;
-                color: #000;
-                margin-bottom: 8mm;
-                text-align: center;
-            }}
-            
-            /* WRAPPER DE LA GRILLE */
-            .sudoku-grid-wrapper {{
-                display: inline-block;
-                border: 3mm solid #000;
-                background: white;
-                margin: 0 auto;
-            }}
-            
-            /* TABLE DE LA GRILLE */
-            .sudoku-table {{
-                border-collapse: collapse;
-                border-spacing: 0;
-                width: auto;
-                height: auto;
-                background: white;
-            }}
-            
-            /* CELLULES DE BASE */
-            .sudoku-cell {{
-                width: {config['cell']};
-                height: {config['cell']};
-                min-width: {config['cell']};
-                min-height: {config['cell']};
-                max-width: {config['cell']};
-                max-height: {config['cell']};
-                
-                font-size: {config['font']};
-                font-weight: bold;
-                font-family: 'Segoe UI', Arial, sans-serif;
-                
-                text-align: center;
-                vertical-align: middle;
-                
-                border: {config['thin']};
-                background: white;
-                color: #000;
-                
-                line-height: {config['cell']};
-                padding: 0;
-                margin: 0;
-            }}
-            
-            /* BORDURES ÉPAISSES POUR BLOCS */
-            .border-top-thick {{
-                border-top: {config['thick']} !important;
-            }}
-            
-            .border-left-thick {{
-                border-left: {config['thick']} !important;
-            }}
-            
-            .border-bottom-thick {{
-                border-bottom: {config['thick']} !important;
-            }}
-            
-            .border-right-thick {{
-                border-right: {config['thick']} !important;
-            }}
-            
-            /* FOOTER */
-            .sudoku-footer {{
-                margin-top: 8mm;
-                font-size: 10pt;
-                color: #666;
-                text-align: center;
-            }}
-            
-            /* STYLES D'IMPRESSION SPÉCIFIQUES */
-            @media print {{
-                .print-container {{
-                    max-width: none;
-                    width: 100%;
-                }}
-                
-                /* Forcer les couleurs */
-                .sudoku-cell {{
-                    -webkit-print-color-adjust: exact !important;
-                    print-color-adjust: exact !important;
-                    color: #000 !important;
-                    background: white !important;
-                }}
-                
-                /* Optimisations par taille */
-                {f'''
-                .sudoku-cell {{
-                    font-size: {config['font']} !important;
-                    width: {config['cell']} !important;
-                    height: {config['cell']} !important;
-                    border: {config['thin']} !important;
-                }}
-                ''' if size <= 16 else f'''
-                .sudoku-cell {{
-                    font-size: {config['font']} !important;
-                    width: {config['cell']} !important;
-                    height: {config['cell']} !important;
-                    border: 0.5mm solid #000 !important;
-                }}
-                .border-top-thick {{ border-top: 2mm solid #000 !important; }}
-                .border-left-thick {{ border-left: 2mm solid #000 !important; }}
-                .border-bottom-thick {{ border-bottom: 2mm solid #000 !important; }}
-                .border-right-thick {{ border-right: 2mm solid #000 !important; }}
-                '''}
-            }}
-        </style>
+        <link rel="stylesheet" href="/print-css/{css_size}?v={get_print_etag(css_size)}">
     </head>
     <body>
         <div class="print-container">
             <!-- TITRE -->
             <div class="sudoku-title">
-                🧩 {grid_type} Sudoku {size}×{size} - Niveau {difficulty.capitalize()}
+                🧩 {grid_type} Sudoku {size}×{size} - Niveau {_LEVEL}
             </div>
             
             <!-- GRILLE -->
             <div class="sudoku-grid-wrapper">
                 <table class="sudoku-table">
-                    {generate_grid_html()}
+                    {_ROWS}
                 </table>
             </div>
             
@@ -264,17 +263,82 @@ def create_sudoku_print_page(grid_data, size, difficulty, is_solution=False):
     </html>
     """
     
-    return css_styles
+
+    head, tail = page.split(_ROWS)
+    before_level, after_level = head.split(_LEVEL)
+    _SHELL_CACHE[key] = (before_level, after_level, tail)
+    return _SHELL_CACHE[key]
+
+
+def _cell_openers(size):
+    """Balise ouvrante ``<td class=...>`` de chaque case (bordures de blocs), par taille"""
+    if size not in _CELL_CACHE:
+        block_size = int(size ** 0.5)
+        openers = []
+        for row_idx in range(size):
+            row = []
+            for col_idx in range(size):
+                # Classes CSS pour bordures de blocs
+                css_classes = ["sudoku-cell"]
+                if row_idx % block_size == 0:
+                    css_classes.append("border-top-thick")
+                if col_idx % block_size == 0:
+                    css_classes.append("border-left-thick")
+                if row_idx == size - 1:
+                    css_classes.append("border-bottom-thick")
+                if col_idx == size - 1:
+                    css_classes.append("border-right-thick")
+                row.append(f'<td class="{" ".join(css_classes)}">')
+            openers.append(row)
+        _CELL_CACHE[size] = openers
+    return _CELL_CACHE[size]
+
+
+# Contenu d'une case : vide pour 0, sinon chiffre ou lettre (A=10, B=11, etc.)
+_SYMBOLS = [""] + [str(n) if n <= 9 else chr(ord('A') + n - 10) for n in range(1, 26)]
+
+
+def render_sudoku_print_page(grid_data, size, difficulty, is_solution=False):
+    """
+    Génère la page d'impression morceau par morceau (une ligne de grille à la fois)
+    
+    Args:
+        grid_data (list): Grille 2D avec 0 pour cases vides
+        size (int): Taille de la grille
+        difficulty (str): Niveau de difficulté
+        is_solution (bool): True si c'est une solution
+    
+    Yields:
+        str: Fragments successifs de la page HTML
+    """
+    before_level, after_level, tail = _compile_shell(size, is_solution)
+    yield before_level + escape(str(difficulty).capitalize()) + after_level
+
+    for openers, values in zip(_cell_openers(size), grid_data):
+        yield "<tr>" + "".join(opener + _SYMBOLS[value] + "</td>"
+                               for opener, value in zip(openers, values)) + "</tr>\n"
+
+    yield tail
+
+
+def create_sudoku_print_page(grid_data, size, difficulty, is_solution=False):
+    """
+    Redessine complètement les grilles pour l'impression en HTML pur
+    
+    Returns:
+        str: Page HTML complète optimisée pour impression
+    """
+    return "".join(render_sudoku_print_page(grid_data, size, difficulty, is_solution))
 
 # ===== FONCTIONS D'INTERFACE =====
 
 def print_empty_sudoku(grid_data, size, difficulty):
-    """Génère l'impression d'une grille vide"""
-    return create_sudoku_print_page(grid_data, size, difficulty, is_solution=False)
+    """Génère l'impression d'une grille vide (flux de fragments HTML)"""
+    return render_sudoku_print_page(grid_data, size, difficulty, is_solution=False)
 
 def print_solved_sudoku(grid_data, size, difficulty):
-    """Génère l'impression d'une solution"""
-    return create_sudoku_print_page(grid_data, size, difficulty, is_solution=True)
+    """Génère l'impression d'une solution (flux de fragments HTML)"""
+    return render_sudoku_print_page(grid_data, size, difficulty, is_solution=True)
 
 # ===== ROUTES FLASK SIMPLIFIÉES =====
 
@@ -300,11 +364,11 @@ if __name__ == "__main__":
     ]
     
     print("🧪 Génération grille vide 4x4...")
-    html_empty = print_empty_sudoku(test_empty, 4, "easy")
+    html_empty = create_sudoku_print_page(test_empty, 4, "easy")
     print(f"✅ {len(html_empty)} caractères générés")
     
     print("🧪 Génération solution 4x4...")
-    html_solution = print_solved_sudoku(test_solved, 4, "easy")
+    html_solution = create_sudoku_print_page(test_solved, 4, "easy", is_solution=True)
     print(f"✅ {len(html_solution)} caractères générés")
     
     # Test avec 25x25
@@ -312,7 +376,7 @@ if __name__ == "__main__":
     test_25x25 = [[random.randint(0, 25) for _ in range(25)] for _ in range(25)]
     
     print("🧪 Génération grille 25x25...")
-    html_25 = print_empty_sudoku(test_25x25, 25, "medium")
+    html_25 = create_sudoku_print_page(test_25x25, 25, "medium")
     print(f"✅ Grille 25x25 générée ({len(html_25)} caractères)")
     
     print("\n🎯 Système d'impression redessiné prêt !")
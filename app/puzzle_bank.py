@@ -0,0 +1,230 @@
+# ===== BANQUE DE GRILLES SUR DISQUE =====
+# Format binaire compact, lu par mmap : un worker tire une grille au hasard
+# par simple calcul d'offset, sans analyser tout le fichier.
+#
+# Disposition du fichier (petit-boutiste) :
+#   en-tête   : magic "SDKB", version (u16), nombre de sections (u16)
+#   sections  : taille (u8), code difficulté (u8), réservé (u16),
+#               taille d'enregistrement (u32), nombre (u32), offset (u64)
+#   données   : enregistrements de taille fixe, contigus par section
+#
+# Un enregistrement = masque des indices (1 bit par case) suivi de la
+# solution (chiffre - 1 sur 4 bits pour 4/9/16, sur 5 bits pour 25).
+# ``encode_givens`` garde le même masque mais seulement les chiffres des
+# indices : aucune solution, pour ce qui part chez le client (cookie).
+
+import logging
+import mmap
+import os
+import random
+import struct
+import time
+
+from app.sudoku import DIFFICULTY_LEVELS, Puzzle, generate_puzzle
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SDKB"
+VERSION = 1
+DIFFICULTIES = ["easy", "medium", "hard", "expert", "extreme"]
+HEADER = struct.Struct("<4sHH")
+SECTION = struct.Struct("<BBHIIQ")
+
+
+def bits_per_cell(size):
+    """4 bits (quartet) jusqu'à 16x16, 5 bits pour 25x25"""
+    return 4 if size <= 16 else 5
+
+
+def record_size(size):
+    """Taille en octets d'un enregistrement pour une taille de grille"""
+    squares = size * size
+    return (squares + 7) // 8 + (squares * bits_per_cell(size) + 7) // 8
+
+
+def encode_puzzle(puzzle):
+    """Encode une grille et sa solution en un enregistrement de taille fixe"""
+    size = puzzle.size
+    bits = bits_per_cell(size)
+    squares = size * size
+    given_mask = 0
+    packed = 0
+    for i in range(squares):
+        r, c = divmod(i, size)
+        if puzzle.grid[r][c]:
+            given_mask |= 1 << i
+        packed |= (puzzle.solution[r][c] - 1) << (i * bits)
+    return (given_mask.to_bytes((squares + 7) // 8, "little") +
+            packed.to_bytes((squares * bits + 7) // 8, "little"))
+
+
+def decode_puzzle(record, size, difficulty):
+    """Reconstruit un ``Puzzle`` depuis un enregistrement"""
+    bits = bits_per_cell(size)
+    squares = size * size
+    mask_len = (squares + 7) // 8
+    given_mask = int.from_bytes(record[:mask_len], "little")
+    packed = int.from_bytes(record[mask_len:], "little")
+    digit_mask = (1 << bits) - 1
+
+    solution = [[0] * size for _ in range(size)]
+    grid = [[0] * size for _ in range(size)]
+    for i in range(squares):
+        r, c = divmod(i, size)
+        value = ((packed >> (i * bits)) & digit_mask) + 1
+        solution[r][c] = value
+        if (given_mask >> i) & 1:
+            grid[r][c] = value
+    return Puzzle(grid, solution, difficulty, size)
+
+
+def encode_givens(grid):
+    """Encode les seuls indices d'une grille (sans solution) : masque puis chiffres des indices"""
+    size = len(grid)
+    bits = bits_per_cell(size)
+    squares = size * size
+    given_mask = 0
+    packed = 0
+    given = 0
+    for i in range(squares):
+        value = grid[i // size][i % size]
+        if value:
+            given_mask |= 1 << i
+            packed |= (value - 1) << (given * bits)
+            given += 1
+    return (given_mask.to_bytes((squares + 7) // 8, "little") +
+            packed.to_bytes((given * bits + 7) // 8, "little"))
+
+
+def decode_givens(data, size):
+    """Grille d'indices depuis ``encode_givens`` ; ValueError si les données sont incohérentes"""
+    bits = bits_per_cell(size)
+    squares = size * size
+    mask_len = (squares + 7) // 8
+    given_mask = int.from_bytes(data[:mask_len], "little")
+    given = bin(given_mask).count("1")
+    if given_mask >> squares or len(data) != mask_len + (given * bits + 7) // 8:
+        raise ValueError("Indices mal encodés")
+    packed = int.from_bytes(data[mask_len:], "little")
+    digit_mask = (1 << bits) - 1
+
+    grid = [[0] * size for _ in range(size)]
+    k = 0
+    for i in range(squares):
+        if (given_mask >> i) & 1:
+            value = ((packed >> (k * bits)) & digit_mask) + 1
+            if value > size:
+                raise ValueError("Indices mal encodés")
+            grid[i // size][i % size] = value
+            k += 1
+    return grid
+
+
+def write_bank(path, sections):
+    """Écrit une banque complète (remplacement atomique du fichier)
+
+    Args:
+        path (str): chemin du fichier
+        sections (dict): (taille, difficulté) -> liste d'enregistrements (bytes)
+    """
+    keys = sorted(k for k, records in sections.items() if records)
+    offset = HEADER.size + SECTION.size * len(keys)
+    table = []
+    for size, difficulty in keys:
+        count = len(sections[(size, difficulty)])
+        table.append(SECTION.pack(size, DIFFICULTIES.index(difficulty), 0,
+                                  record_size(size), count, offset))
+        offset += count * record_size(size)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+        for entry in table:
+            f.write(entry)
+        for key in keys:
+            for record in sections[key]:
+                f.write(record)
+    # ✅ Les workers qui ont déjà mappé l'ancien fichier continuent de le lire
+    os.replace(tmp_path, path)
+
+
+class PuzzleBank:
+    """Lecture par mmap d'une banque de grilles"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.sections = {}
+
+        magic, version, section_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Banque de grilles invalide : {path}")
+        for i in range(section_count):
+            size, code, _, rec_size, count, offset = SECTION.unpack_from(
+                self._map, HEADER.size + i * SECTION.size)
+            self.sections[(size, DIFFICULTIES[code])] = (rec_size, count, offset)
+
+    def count(self, size, difficulty):
+        """Nombre de grilles disponibles pour (taille, difficulté)"""
+        return self.sections.get((size, difficulty), (0, 0, 0))[1]
+
+    def record(self, size, difficulty, index):
+        """Enregistrement brut numéro ``index``"""
+        rec_size, count, offset = self.sections[(size, difficulty)]
+        if not 0 <= index < count:
+            raise IndexError(index)
+        start = offset + index * rec_size
+        return self._map[start:start + rec_size]
+
+    def random_puzzle(self, difficulty, size):
+        """Tire une grille au hasard, ou None si la section est vide"""
+        count = self.count(size, difficulty)
+        if not count:
+            return None
+        return decode_puzzle(self.record(size, difficulty, random.randrange(count)), size, difficulty)
+
+    def read_records(self):
+        """Tous les enregistrements, par (taille, difficulté)"""
+        return {key: [self.record(*key, i) for i in range(count)]
+                for key, (_, count, _) in self.sections.items()}
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def open_bank(path):
+    """Ouvre la banque si le fichier existe, sinon retourne None"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return PuzzleBank(path)
+    except (OSError, ValueError, struct.error):
+        logger.exception(f"❌ Banque de grilles illisible : {path}")
+        return None
+
+
+def fill_bank(path, sizes, difficulties, count):
+    """Ajoute ``count`` grilles uniques par (taille, difficulté) à la banque"""
+    sections = {}
+    existing = open_bank(path)
+    if existing is not None:
+        sections = existing.read_records()
+        existing.close()
+
+    for size in sizes:
+        for difficulty in difficulties:
+            if difficulty not in DIFFICULTY_LEVELS.get(size, []):
+                continue
+            start_time = time.time()
+            for _ in range(count):
+                # ✅ Rangée sous le niveau réellement obtenu (voir generate_puzzle)
+                puzzle = generate_puzzle(difficulty, size, unique=True)
+                sections.setdefault((size, puzzle.difficulty), []).append(encode_puzzle(puzzle))
+            logger.info(f"✅ {count} grilles {size}x{size} {difficulty} "
+                        f"en {time.time() - start_time:.1f}s (total {len(sections.get((size, difficulty), []))})")
+
+    write_bank(path, sections)
+    return sections
@@ -0,0 +1,118 @@
+# ===== RÉSERVE DE GRILLES PRÉ-GÉNÉRÉES =====
+# /start pioche une grille prête (avec sa solution) au lieu de la générer
+# sur le thread de la requête ; un worker de fond remplit la réserve.
+# Les dernières grilles générées servent de graines : réserve vide, /start
+# reçoit une variante symétrique d'une graine (transform_puzzle) au lieu
+# d'attendre une génération complète.
+
+import logging
+import random
+import threading
+from collections import deque
+
+from app.sudoku import DIFFICULTY_LEVELS, generate_puzzle, transform_puzzle
+
+logger = logging.getLogger(__name__)
+
+
+class PuzzlePool:
+    """Réserve de grilles par (taille, difficulté), remplie en tâche de fond
+
+    Args:
+        executor: exécuteur partagé utilisé pour les remplissages
+        high_water (int): nombre de grilles visé pour chaque (taille, difficulté)
+        generator: fonction ``(difficulty, size) -> Puzzle``
+        seeds (int): grilles générées conservées comme graines pour chaque (taille, difficulté)
+    """
+
+    def __init__(self, executor, high_water=3, generator=None, seeds=20):
+        self.executor = executor
+        self.high_water = high_water
+        self.generator = generator or (lambda difficulty, size: generate_puzzle(difficulty, size, unique=True))
+        self.seeds = seeds
+        self._pools = {}
+        self._seeds = {}
+        self._refilling = set()
+        self._stats = {"hits": 0, "misses": 0, "variants": 0, "generated": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def get(self, difficulty, size):
+        """Retourne une grille prête, sinon une variante d'une graine, sinon en génère une immédiatement"""
+        key = (size, difficulty)
+        seed = None
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            puzzle = pool.popleft() if pool else None
+            if puzzle is not None:
+                self._stats["hits"] += 1
+            elif self._seeds.get(key):
+                seed = random.choice(self._seeds[key])
+                self._stats["variants"] += 1
+            else:
+                self._stats["misses"] += 1
+
+        self._schedule_refill(key)
+        if seed is not None:
+            # ✅ Réserve vide : variante symétrique d'une graine, sans solveur
+            puzzle = transform_puzzle(seed)
+        elif puzzle is None:
+            # ✅ Repli synchrone : ni réserve ni graine
+            puzzle = self.generator(difficulty, size)
+            self._add_seed(key, puzzle)
+        return puzzle
+
+    def _add_seed(self, key, puzzle):
+        with self._lock:
+            self._seeds.setdefault(key, deque(maxlen=self.seeds)).append(puzzle)
+
+    def warm(self, keys=None):
+        """Lance le remplissage de toutes les réserves (ou de celles demandées)"""
+        if keys is None:
+            keys = [(size, difficulty) for size, levels in DIFFICULTY_LEVELS.items() for difficulty in levels]
+        for key in keys:
+            self._schedule_refill(key)
+
+    def _schedule_refill(self, key):
+        with self._lock:
+            if key in self._refilling or len(self._pools.get(key, ())) >= self.high_water:
+                return
+            self._refilling.add(key)
+        try:
+            self.executor.submit(self._refill_one, key)
+        except RuntimeError:
+            # Exécuteur arrêté (fin du serveur)
+            with self._lock:
+                self._refilling.discard(key)
+
+    def _refill_one(self, key):
+        """Génère UNE grille puis se replanifie, pour ne pas monopoliser un worker"""
+        size, difficulty = key
+        try:
+            puzzle = self.generator(difficulty, size)
+        except Exception:
+            logger.exception(f"❌ Échec du remplissage de la réserve {size}x{size} {difficulty}")
+            with self._lock:
+                self._stats["errors"] += 1
+                self._refilling.discard(key)
+            return
+
+        with self._lock:
+            self._pools.setdefault(key, deque()).append(puzzle)
+            self._stats["generated"] += 1
+            self._refilling.discard(key)
+        self._add_seed(key, puzzle)
+        self._schedule_refill(key)
+
+    def stats(self):
+        """Statistiques de la réserve (succès, échecs, niveau de chaque réserve)"""
+        with self._lock:
+            requests = self._stats["hits"] + self._stats["variants"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / requests, 3) if requests else None,
+                "high_water": self.high_water,
+                "levels": {f"{size}x{size}/{difficulty}": len(pool)
+                           for (size, difficulty), pool in sorted(self._pools.items())},
+                "seeds": {f"{size}x{size}/{difficulty}": len(seeds)
+                          for (size, difficulty), seeds in sorted(self._seeds.items())},
+            }
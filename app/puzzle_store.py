@@ -0,0 +1,114 @@
+# ===== STOCKAGE SERVEUR DES GRILLES GÉNÉRÉES =====
+# Les solutions restent côté serveur : /solution et /check n'ont plus
+# besoin de relancer le solveur pour une grille que nous avons générée.
+# La session ne contient que l'identifiant court de la grille.
+#
+# Deux backends, même interface (put / get / len) :
+#   PuzzleStore        : LRU en mémoire, propre à chaque processus
+#   SqlitePuzzleStore  : fichier SQLite partagé entre les workers gunicorn
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.puzzle_bank import decode_puzzle, encode_puzzle
+
+logger = logging.getLogger(__name__)
+
+
+class PuzzleStore:
+    """Stockage LRU en mémoire des grilles (``Puzzle``) indexées par identifiant"""
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._puzzles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, puzzle):
+        """Enregistre une grille et retourne son identifiant"""
+        with self._lock:
+            self._puzzles[puzzle.id] = puzzle
+            self._puzzles.move_to_end(puzzle.id)
+            while len(self._puzzles) > self.max_entries:
+                self._puzzles.popitem(last=False)
+        return puzzle.id
+
+    def get(self, puzzle_id):
+        """Retourne la grille associée à ``puzzle_id`` ou None"""
+        if not puzzle_id:
+            return None
+        with self._lock:
+            puzzle = self._puzzles.get(puzzle_id)
+            if puzzle is not None:
+                self._puzzles.move_to_end(puzzle_id)
+            return puzzle
+
+    def __len__(self):
+        return len(self._puzzles)
+
+
+class SqlitePuzzleStore:
+    """Stockage SQLite des grilles, au format compact de la banque (``encode_puzzle``)
+
+    Les grilles les moins récemment lues sont supprimées au-delà de
+    ``max_entries`` (contrôle tous les ``trim_every`` ajouts).
+    """
+
+    def __init__(self, path, max_entries=100000, trim_every=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.trim_every = trim_every
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")  # Lectures concurrentes entre workers
+        self._db.execute("CREATE TABLE IF NOT EXISTS puzzles ("
+                         "id TEXT PRIMARY KEY, size INTEGER, difficulty TEXT, "
+                         "record BLOB, accessed REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS puzzles_accessed ON puzzles (accessed)")
+        self._db.commit()
+
+    def put(self, puzzle):
+        """Enregistre une grille et retourne son identifiant"""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO puzzles VALUES (?, ?, ?, ?, ?)",
+                             (puzzle.id, puzzle.size, puzzle.difficulty, encode_puzzle(puzzle), time.time()))
+            self._puts += 1
+            if self._puts % self.trim_every == 0:
+                self._db.execute("DELETE FROM puzzles WHERE id IN (SELECT id FROM puzzles "
+                                 "ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            self._db.commit()
+        return puzzle.id
+
+    def get(self, puzzle_id):
+        """Retourne la grille associée à ``puzzle_id`` ou None"""
+        if not puzzle_id:
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT size, difficulty, record FROM puzzles WHERE id = ?",
+                                   (puzzle_id,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE puzzles SET accessed = ? WHERE id = ?", (time.time(), puzzle_id))
+            self._db.commit()
+        size, difficulty, record = row
+        puzzle = decode_puzzle(record, size, difficulty)
+        puzzle.id = puzzle_id
+        return puzzle
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+
+def open_store(spec=None):
+    """Crée le stockage décrit par ``spec`` : "memory" (défaut) ou "sqlite:<chemin>" """
+    if spec and spec.startswith("sqlite:"):
+        path = spec[len("sqlite:"):]
+        try:
+            return SqlitePuzzleStore(path)
+        except sqlite3.Error:
+            logger.exception(f"❌ Stockage SQLite indisponible : {path}, repli en mémoire")
+    return PuzzleStore()
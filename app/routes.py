@@ -1,16 +1,134 @@
-from flask import render_template, request, session, jsonify
+from flask import Response, render_template, request, session, jsonify, stream_with_context
 from app import app
-from app.sudoku import generate_sudoku, solve_sudoku, check_solution, to_symbol
-import copy
+from app.sudoku import DIFFICULTY_LEVELS, Puzzle, transform_puzzle, validate_solution, to_symbol
+from app.puzzle_store import open_store
+from app.puzzle_pool import PuzzlePool
+from app.puzzle_bank import decode_givens, encode_givens, open_bank
+from app.solve_service import ServiceBusy, SolveService
+from app.solution_cache import SolutionCache
+from app.solve_jobs import FINISHED, SolveJobs
+import base64
+import binascii
+import json
+import os
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 import atexit
 
 # ✅ IMPORT DU MODULE D'IMPRESSION
-from app.print_styles import print_empty_sudoku, print_solved_sudoku
+from app.print_styles import (PRINT_CONFIGS, generate_print_css, get_print_config, get_print_etag,
+                              print_empty_sudoku, print_solved_sudoku)
 
-# ✅ ThreadPoolExecutor pour exécuter le solveur sans bloquer Flask
+# ✅ ThreadPoolExecutor pour les tâches de fond légères (remplissage de la réserve)
 executor = ThreadPoolExecutor(max_workers=2)
 
+# ✅ Résolutions sur un pool de processus : les grosses grilles n'occupent plus le GIL du serveur
+solve_service = SolveService(
+    workers=int(os.environ["SUDOKU_SOLVE_WORKERS"]) if os.environ.get("SUDOKU_SOLVE_WORKERS") else None,
+    max_pending=int(os.environ.get("SUDOKU_SOLVE_QUEUE", 8)),
+    # ✅ Solutions déjà trouvées (ou variantes symétriques) servies sans relancer le solveur
+    cache=SolutionCache(max_entries=int(os.environ.get("SUDOKU_SOLUTION_CACHE", 5000))),
+)
+
+# ✅ Tâches de résolution asynchrones (soumission, statut, flux de progression)
+solve_jobs = SolveJobs(solve_service)
+
+def solve_timeout(size):
+    """Timeout adaptatif d'une résolution selon la taille"""
+    return 10 if size <= 9 else (60 if size <= 16 else 120)
+
+def valid_grid(grid):
+    """Grille carrée de taille connue, cases entières (booléens JSON exclus) entre 0 et la taille"""
+    if not isinstance(grid, list) or len(grid) not in DIFFICULTY_LEVELS:
+        return False
+    size = len(grid)
+    return all(isinstance(row, list) and len(row) == size and
+               all(isinstance(v, int) and not isinstance(v, bool) and 0 <= v <= size for v in row)
+               for row in grid)
+
+def player_grid_shape(grid, size):
+    """Grille joueur de forme ``size`` x ``size`` : lignes listes, cases entières ou null"""
+    return isinstance(grid, list) and len(grid) == size and \
+        all(isinstance(row, list) and len(row) == size and
+            all(v is None or (isinstance(v, int) and not isinstance(v, bool)) for v in row) for row in grid)
+
+# Grilles acceptées au plus par requête sur les routes de lot
+BATCH_MAX_GRIDS = int(os.environ.get("SUDOKU_BATCH_MAX", 100))
+
+def batch_items():
+    """Tableau JSON du corps de requête (ou sa clé ``items``), None s'il manque"""
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("items")
+    return data if isinstance(data, list) and data else None
+
+def ndjson_response(lines):
+    """Réponse NDJSON envoyée au fil de l'eau (une ligne JSON par résultat)"""
+    return Response(stream_with_context(json.dumps(line) + "\n" for line in lines),
+                    mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ✅ Banque de grilles sur disque (optionnelle, voir app/puzzle_bank.py)
+puzzle_bank = open_bank(os.environ.get("SUDOKU_BANK_PATH", "puzzles.bank"))
+
+# ✅ Réserve de grilles prêtes, remplie en tâche de fond par l'executor
+puzzle_pool = PuzzlePool(executor, high_water=int(os.environ.get("SUDOKU_POOL_SIZE", 3)))
+
+def warm_puzzle_pool():
+    """Pré-remplit la réserve pour les niveaux absents de la banque"""
+    keys = [(size, difficulty) for size, levels in DIFFICULTY_LEVELS.items() for difficulty in levels
+            if puzzle_bank is None or not puzzle_bank.count(size, difficulty)]
+    puzzle_pool.warm(keys)
+
+# ✅ Grilles générées et leurs solutions, indexées par l'identifiant stocké en session
+# (SUDOKU_STORE=sqlite:<chemin> pour partager les grilles entre workers)
+puzzle_store = open_store(os.environ.get("SUDOKU_STORE", "memory"))
+
+def remember_puzzle(puzzle):
+    """Enregistre la grille côté serveur et, en secours, ses seuls indices dans la session signée
+
+    Le cookie est signé mais pas chiffré : la solution n'y figure jamais.
+    """
+    puzzle_store.put(puzzle)
+    session["puzzle_id"] = puzzle.id
+    session["puzzle"] = [puzzle.size, puzzle.difficulty,
+                         base64.b64encode(encode_givens(puzzle.grid)).decode("ascii")]
+
+def session_givens():
+    """Indices de la grille de session, depuis le cookie : ``(taille, difficulté, grille)`` ou None"""
+    try:
+        size, difficulty, givens = session["puzzle"]
+        if size not in DIFFICULTY_LEVELS:
+            return None
+        return size, difficulty, decode_givens(base64.b64decode(givens, validate=True), size)
+    except (KeyError, TypeError, ValueError, binascii.Error):
+        return None
+
+def current_puzzle():
+    """Grille de la session courante : stockage serveur, sinon indices du cookie résolus à nouveau
+
+    Le secours couvre les workers qui ne partagent pas le stockage mémoire,
+    les redémarrages et les évictions du LRU ; None si la grille est
+    illisible ou si sa résolution échoue.
+    """
+    puzzle_id = session.get("puzzle_id")
+    puzzle = puzzle_store.get(puzzle_id)
+    if puzzle is not None or not puzzle_id:
+        return puzzle
+    givens = session_givens()
+    if givens is None:
+        return None
+    size, difficulty, grid = givens
+    # ✅ Solution retrouvée par le service (cache des solutions, sinon pool de processus)
+    try:
+        outcome, solved, _ = solve_service.solve(grid, solve_timeout(size))
+    except (ServiceBusy, TimeoutError):
+        return None
+    if outcome != "solved":
+        return None
+    puzzle = Puzzle(grid, solved, difficulty, size, puzzle_id=puzzle_id)
+    puzzle_store.put(puzzle)
+    return puzzle
+
 @app.route("/")
 def index():
     user_agent = request.headers.get("User-Agent", "").lower()
@@ -35,153 +153,254 @@ def start_game():
     elif size == 16 and difficulty not in ["easy", "medium", "hard"]:
         difficulty = "hard"    # Forcer au maximum "difficile" pour 16x16
 
-    grid = generate_sudoku(difficulty, size)
-    session["original_grid"] = copy.deepcopy(grid)
-    session["difficulty"] = difficulty  # ✅ NOUVEAU : Stocker la difficulté
-    session["size"] = size  # ✅ NOUVEAU : Stocker la taille
+    puzzle = puzzle_bank.random_puzzle(difficulty, size) if puzzle_bank is not None else None
+    if puzzle is not None:
+        # ✅ Chaque grille de la banque donne une infinité de variantes équivalentes
+        puzzle = transform_puzzle(puzzle)
+    else:
+        puzzle = puzzle_pool.get(difficulty, size)
+    grid = puzzle.grid
+    # Solution connue : alimente le cache, en tâche de fond (mise en forme canonique)
+    executor.submit(solve_service.cache.put, puzzle.grid, puzzle.solution)
+    # ✅ Cookie léger : identifiant + indices compacts (sans la solution)
+    session.clear()
+    remember_puzzle(puzzle)
 
     user_agent = request.headers.get("User-Agent", "").lower()
     is_mobile = any(device in user_agent for device in ["iphone", "android", "ipad", "mobile"])
     template = "game_mobile.html" if is_mobile else "game_desktop.html"
 
-    return render_template(template, grid=grid, difficulty=difficulty, size=size, to_symbol=to_symbol)
+    # ✅ Niveau affiché : celui de la grille servie (note obtenue si la bande visée a été manquée)
+    return render_template(template, grid=grid, difficulty=puzzle.difficulty, size=size, to_symbol=to_symbol)
 
 @app.route("/check", methods=["POST"])
 def check():
     data = request.json
     user_grid = data.get("grid", [])
-    original_grid = session.get("original_grid", [])
+    puzzle = current_puzzle()
 
-    if not user_grid or not original_grid:
+    if not user_grid or puzzle is None:
         return jsonify({"result": "error", "message": "Données manquantes"}), 400
 
-    is_correct = check_solution(user_grid, original_grid)
-    return jsonify({"result": "ok", "correct": is_correct})
+    # ✅ Validation par contraintes : aucune résolution nécessaire
+    is_correct, conflicts = validate_solution(user_grid, puzzle.grid)
+    return jsonify({"result": "ok", "correct": is_correct, "conflicts": conflicts})
+
+@app.route("/check-batch", methods=["POST"])
+def check_batch():
+    """Vérifie un lot de grilles : ``[{"grid": ..., "original": ...}, ...]``, hors session
+
+    Réponse NDJSON : ``{"index", "correct", "conflicts"}`` par grille.
+    """
+    items = batch_items()
+    if items is None:
+        return jsonify({"error": "Tableau de grilles attendu"}), 400
+    if len(items) > BATCH_MAX_GRIDS:
+        return jsonify({"error": f"Lot trop grand (max {BATCH_MAX_GRIDS} grilles)"}), 413
+
+    # ✅ Tout le lot est contrôlé avant de répondre
+    invalid = [index for index, item in enumerate(items)
+               if not isinstance(item, dict) or not valid_grid(item.get("original"))
+               or not player_grid_shape(item.get("grid"), len(item["original"]))]
+    if invalid:
+        return jsonify({"error": "Grilles invalides", "invalid": invalid}), 400
+
+    def results():
+        # Validation par contraintes : trop rapide pour valoir un aller-retour vers le pool
+        for index, item in enumerate(items):
+            is_correct, conflicts = validate_solution(item["grid"], item["original"])
+            yield {"index": index, "correct": is_correct, "conflicts": conflicts}
+
+    return ndjson_response(results())
+
+@app.route("/solution-batch", methods=["POST"])
+def solution_batch():
+    """Résout un lot de grilles (``[grille, ...]`` ou ``[{"grid": ...}, ...]``), hors session
+
+    Les grilles sont réparties sur le pool de résolution ; la réponse NDJSON
+    donne ``{"index", "status", "solution"}`` dans l'ordre d'achèvement.
+    """
+    items = batch_items()
+    if items is None:
+        return jsonify({"error": "Tableau de grilles attendu"}), 400
+    if len(items) > BATCH_MAX_GRIDS:
+        return jsonify({"error": f"Lot trop grand (max {BATCH_MAX_GRIDS} grilles)"}), 413
+
+    grids = [item.get("grid") if isinstance(item, dict) else item for item in items]
+    invalid = [index for index, grid in enumerate(grids) if not valid_grid(grid)]
+    if invalid:
+        return jsonify({"error": "Grilles invalides", "invalid": invalid}), 400
+
+    timeout = solve_timeout(max(len(grid) for grid in grids))
+
+    def results():
+        for index, outcome, solved in solve_service.solve_batch(grids, timeout, total_timeout=3 * timeout):
+            line = {"index": index, "status": outcome}
+            if solved is not None:
+                line["solution"] = solved
+            yield line
+
+    return ndjson_response(results())
 
 @app.route("/solution", methods=["GET"])
 def solution():
-    original = session.get("original_grid", [])
-    if not original:
+    puzzle = current_puzzle()
+    if puzzle is None:
         return jsonify({"error": "Grille non trouvée"}), 400
 
-    solved = copy.deepcopy(original)
+    # ?debug=1 : force la résolution et renvoie les compteurs du solveur
+    debug = request.args.get("debug") == "1"
 
-    # 🔁 Résolution en tâche de fond avec timeout adaptatif
-    size = len(solved)
-    timeout = 10 if size <= 9 else (60 if size <= 16 else 120)  # Timeout adaptatif
-    
-    future = executor.submit(solve_sudoku, solved)
+    # ✅ Grille générée par nous : la solution est déjà connue
+    if not debug:
+        return jsonify({"solution": puzzle.solution})
+    original = puzzle.grid
+
+    # 🔁 Résolution dans un processus du service avec timeout adaptatif
+    timeout = solve_timeout(len(original))
 
     try:
-        success = future.result(timeout=timeout)
-        if not success:
-            return jsonify({"error": "Grille non résoluble"}), 400
+        # ✅ Le worker s'arrête de lui-même à l'échéance : son processus est aussitôt libéré
+        # Mode debug : on veut les compteurs d'une vraie résolution, pas le cache
+        outcome, solved, stats = solve_service.solve(original, timeout, with_stats=debug, use_cache=not debug)
+    except ServiceBusy:
+        return jsonify({"error": "⏳ Serveur occupé, réessayez dans un instant"}), 503, {"Retry-After": "5"}
     except TimeoutError:
-        return jsonify({"error": f"⏱️ Résolution trop longue (>{timeout}s)"}), 504
+        outcome, solved, stats = "timeout", None, None
+
+    def respond(payload, status=200):
+        if stats is not None:
+            payload["stats"] = stats  # Partielles en cas de timeout
+        return jsonify(payload), status
+
+    if outcome == "unsolvable":
+        return respond({"error": "Grille non résoluble"}, 400)
+    if outcome == "timeout":
+        return respond({"error": f"⏱️ Résolution trop longue (>{timeout}s)"}, 504)
+
+    return respond({"solution": solved})
+
+@app.route("/solve-jobs", methods=["POST"])
+def submit_solve_job():
+    """Soumet une résolution ; retourne l'identifiant de la tâche (202)
+
+    Corps JSON optionnel ``{"grid": [[...]]}`` (clients de l'API) ; par défaut,
+    la grille de la session (bouton Solution de la page de jeu). Sa solution
+    est en général connue et renvoyée aussitôt ; si ce worker ne la connaît
+    pas, ses indices (cookie) sont résolus dans une tâche plutôt que dans la requête.
+    """
+    data = request.get_json(silent=True) or {}
+    grid = data.get("grid")
+    if grid is None:
+        # ✅ Grille générée par nous : la solution est déjà connue, pas de tâche
+        puzzle = puzzle_store.get(session.get("puzzle_id"))
+        if puzzle is not None:
+            return jsonify({"status": "done", "solution": puzzle.solution})
+        givens = session_givens()
+        grid = givens[2] if givens is not None else None
+    if not valid_grid(grid):
+        return jsonify({"error": "Grille invalide ou manquante"}), 400
+
+    try:
+        job = solve_jobs.submit(grid, solve_timeout(len(grid)))
+    except ServiceBusy:
+        return jsonify({"error": "⏳ Serveur occupé, réessayez dans un instant"}), 503, {"Retry-After": "5"}
+    return jsonify(job.snapshot()), 202, {"Location": f"/solve-jobs/{job.id}"}
+
+@app.route("/solve-jobs/<job_id>")
+def solve_job_status(job_id):
+    """Statut, progression et, une fois terminée, solution de la tâche"""
+    job = solve_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue"}), 404
+    return jsonify(job)
+
+@app.route("/solve-jobs/<job_id>/events")
+def solve_job_events(job_id):
+    """Flux Server-Sent Events : ``progress`` pendant la résolution, puis ``done``"""
+    if solve_jobs.get(job_id) is None:
+        return jsonify({"error": "Tâche inconnue"}), 404
+
+    def stream():
+        version = None
+        while True:
+            job = solve_jobs.wait(job_id, version, timeout=15)
+            if job is None:
+                return
+            if job["version"] == version:
+                yield ": keep-alive\n\n"  # Commentaire SSE : garde la connexion ouverte derrière un proxy
+                continue
+            version = job["version"]
+            if job["status"] in FINISHED:
+                yield f"event: done\ndata: {json.dumps(job)}\n\n"
+                return
+            yield f"event: progress\ndata: {json.dumps(job['progress'])}\n\n"
 
-    return jsonify({"solution": solved})
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/pool-stats")
+def pool_stats():
+    """Statistiques de la réserve de grilles pré-générées"""
+    return jsonify(puzzle_pool.stats())
+
+@app.route("/solve-stats")
+def solve_stats():
+    """Statistiques du service de résolution (file, refus, résolutions en cours)"""
+    return jsonify(solve_service.stats())
 
 # ===== NOUVELLES ROUTES POUR LE MODULE D'IMPRESSION =====
 
+def html_stream(fragments):
+    """Page HTML envoyée au fil de sa génération (enveloppe précompilée, puis ligne par ligne)"""
+    return Response(fragments, mimetype="text/html")
+
+def print_asset(body, etag, mimetype):
+    """Ressource d'impression précalculée : ETag (réponse 304 si inchangée) et cache navigateur/CDN"""
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    # URL versionnée par l'empreinte (?v=...) : le contenu ne changera jamais
+    if request.args.get("v") == etag:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "public, max-age=86400"
+    return response.make_conditional(request)
+
+@app.route("/print-css/<int:size>")
 @app.route("/print-css/<int:size>/<difficulty>")
-def get_print_css_route(size, difficulty):
-    """Retourne le CSS d'impression dynamique pour une taille/difficulté"""
-    css = generate_print_css(size, difficulty)
-    return css, 200, {'Content-Type': 'text/css'}
+def get_print_css_route(size, difficulty=None):
+    """Retourne le CSS d'impression précalculé d'une taille (le même pour tous les niveaux)"""
+    if size not in PRINT_CONFIGS:
+        return "Taille inconnue", 404
+    return print_asset(generate_print_css(size), get_print_etag(size), "text/css")
 
 @app.route("/print-solution", methods=["POST"])
 def print_solution():
     """Génère le HTML d'impression pour une solution"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     grid = data.get("grid", [])
-    size = data.get("size", 9)
-    difficulty = data.get("difficulty", "medium")
-    
-    if not grid:
+    if not valid_grid(grid):
         return jsonify({"error": "Grille manquante"}), 400
     
-    html = generate_solution_html(grid, size, difficulty)
-    return html, 200, {'Content-Type': 'text/html'}
+    return html_stream(print_solved_sudoku(grid, len(grid), data.get("difficulty", "medium")))
 
 @app.route("/print-empty")
 def print_empty_grid():
     """Retourne une page prête pour imprimer la grille vide"""
-    # Récupérer les données depuis la session
-    original_grid = session.get("original_grid", [])
-    difficulty = session.get("difficulty", "medium")
-    size = session.get("size", 9)
-    
-    if not original_grid:
+    # Récupérer la grille de la session dans le stockage serveur
+    puzzle = current_puzzle()
+    if puzzle is None:
         return "Erreur: Aucune grille en cours", 400
     
-    # Générer le CSS d'impression
-    css = generate_print_css(size, difficulty)
-    
-    # Générer le HTML de la grille
-    block_size = int(size ** 0.5)
-    table_html = ""
-    
-    for r in range(size):
-        table_html += "<tr>"
-        for c in range(size):
-            val = original_grid[r][c]
-            
-            # Classes pour bordures de blocs
-            classes = []
-            if r % block_size == 0:
-                classes.append('top-block')
-            if c % block_size == 0:
-                classes.append('left-block') 
-            if r == size - 1:
-                classes.append('bottom-block')
-            if c == size - 1:
-                classes.append('right-block')
-            
-            class_attr = f'class="{" ".join(classes)}"' if classes else ""
-            
-            if val == 0:
-                table_html += f'<td {class_attr}><input type="text" maxlength="1"></td>'
-            else:
-                symbol = str(val) if val <= 9 else chr(55 + val)
-                table_html += f'<td {class_attr}><span class="fixed">{symbol}</span></td>'
-        
-        table_html += "</tr>"
-    
-    # HTML complet avec CSS intégré
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-      <title>Grille Sudoku {size}x{size} - {difficulty.capitalize()}</title>
-      <style>{css}</style>
-    </head>
-    <body>
-      <div class="game-frame">
-        <div class="sudoku-wrapper">
-          <table>
-            {table_html}
-          </table>
-        </div>
-      </div>
-      <script>
-        window.onload = function() {{ 
-          window.print(); 
-          window.onafterprint = function() {{
-            window.close();
-          }};
-        }};
-      </script>
-    </body>
-    </html>
-    """
-    
-    return html
+    return html_stream(print_empty_sudoku(puzzle.grid, puzzle.size, puzzle.difficulty))
 
 @app.route("/print-config/<int:size>")
 def get_print_config_route(size):
     """API pour récupérer la configuration d'impression d'une taille"""
-    config = get_print_config(size)
-    return jsonify(config)
+    if size not in PRINT_CONFIGS:
+        return jsonify({"error": "Taille inconnue"}), 404
+    # Même version que le CSS : il est entièrement dérivé de cette configuration
+    return print_asset(json.dumps(get_print_config(size)), get_print_etag(size), "application/json")
 
 @app.route("/print-test/<int:size>/<difficulty>")
 def print_test(size, difficulty):
@@ -220,18 +439,19 @@ def shutdown_executor():
     
 @app.route("/perfect-print-empty")
 def perfect_print_empty():
-    grid = session.get("original_grid", [])
-    size = session.get("size", 9)  
-    difficulty = session.get("difficulty", "medium")
+    puzzle = current_puzzle()
+    if puzzle is None:
+        return "Erreur: Aucune grille en cours", 400
     
-    html = print_empty_sudoku(grid, size, difficulty)
-    return html
+    return html_stream(print_empty_sudoku(puzzle.grid, puzzle.size, puzzle.difficulty))
 
 @app.route("/perfect-print-solution", methods=["POST"])  
 def perfect_print_solution():
-    data = request.json
-    html = print_solved_sudoku(data["grid"], data["size"], data["difficulty"])
-    return html
+    data = request.get_json(silent=True) or {}
+    grid = data.get("grid")
+    if not valid_grid(grid):
+        return "Erreur: Grille invalide", 400
+    return html_stream(print_solved_sudoku(grid, len(grid), data.get("difficulty", "medium")))
     
 
 
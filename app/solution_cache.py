@@ -0,0 +1,200 @@
+# ===== CACHE DES SOLUTIONS PAR FORME CANONIQUE =====
+# Une grille et ses variantes symétriques (chiffres renommés, bandes et
+# piles permutées, lignes/colonnes permutées dans leur bande, transposition)
+# ont la même solution à la transformation près. Le cache les range sous
+# une même clé : la forme canonique de la grille. Une solution trouvée pour
+# une variante est ramenée sur la grille demandée par la transformation
+# inverse, puis vérifiée par contraintes avant d'être servie.
+#
+# Forme canonique : les bandes, lignes, piles et colonnes sont triées par
+# des signatures invariantes (indices par ligne, par colonne, fréquence des
+# chiffres) ; les égalités restantes sont départagées en essayant les
+# arrangements (au plus ``max_candidates``) et en gardant la plus petite
+# grille, chiffres renumérotés par ordre d'apparition.
+
+import sys
+import threading
+from collections import OrderedDict
+from itertools import groupby, islice, permutations, product
+
+from app.sudoku import validate_solution
+
+
+def _transpose(grid):
+    return [list(col) for col in zip(*grid)]
+
+
+def _tied_orders(items, key):
+    """Ordres de ``items`` triés par ``key``, les ex aequo permutés de toutes les façons"""
+    groups = [list(group) for _, group in groupby(sorted(items, key=key), key=key)]
+    for parts in product(*(permutations(group) for group in groups)):
+        yield tuple(item for part in parts for item in part)
+
+
+def _line_orders(blocks, line_key):
+    """Ordres des lignes (ou colonnes) : bandes triées, puis lignes triées dans chaque bande"""
+    def block_key(block):
+        return sorted(line_key(line) for line in block)
+
+    for block_order in _tied_orders(blocks, block_key):
+        for parts in product(*(_tied_orders(block, line_key) for block in block_order)):
+            yield [line for part in parts for line in part]
+
+
+def _signatures(grid):
+    """Signatures des lignes et des colonnes, invariantes par renommage et permutation"""
+    size = len(grid)
+    freq = {}
+    row_count = [0] * size
+    col_count = [0] * size
+    for r, row in enumerate(grid):
+        for c, value in enumerate(row):
+            if value:
+                freq[value] = freq.get(value, 0) + 1
+                row_count[r] += 1
+                col_count[c] += 1
+    rows = [(row_count[r], sorted(col_count[c] for c in range(size) if grid[r][c]),
+             sorted(freq[v] for v in grid[r] if v)) for r in range(size)]
+    cols = [(col_count[c], sorted(row_count[r] for r in range(size) if grid[r][c]),
+             sorted(freq[grid[r][c]] for r in range(size) if grid[r][c])) for c in range(size)]
+    return rows, cols
+
+
+def canonical_form(grid, max_candidates=256):
+    """Forme canonique d'une grille
+
+    Returns:
+        tuple: (clé bytes, transformation) ; la transformation
+        ``(transposée, lignes, colonnes, renommage)`` sert à passer une
+        solution de la grille à la forme canonique et inversement.
+    """
+    size = len(grid)
+    block = int(size ** 0.5)
+    bands = [list(range(b * block, (b + 1) * block)) for b in range(block)]
+
+    orientations = []
+    for transposed in (False, True):
+        oriented = _transpose(grid) if transposed else grid
+        rows, cols = _signatures(oriented)
+        signature = (sorted(sorted(rows[r] for r in band) for band in bands),
+                     sorted(sorted(cols[c] for c in band) for band in bands))
+        orientations.append((signature, transposed, oriented, rows, cols))
+    best_signature = min(item[0] for item in orientations)
+    orientations = [item for item in orientations if item[0] == best_signature]
+
+    best = None
+    per_orientation = max(1, max_candidates // len(orientations))
+    for _, transposed, oriented, rows, cols in orientations:
+        candidates = product(_line_orders(bands, rows.__getitem__), _line_orders(bands, cols.__getitem__))
+        for row_order, col_order in islice(candidates, per_orientation):
+            mapping = {}
+            out = bytearray(size * size)
+            i = 0
+            for r in row_order:
+                line = oriented[r]
+                for c in col_order:
+                    value = line[c]
+                    if value:
+                        label = mapping.get(value)
+                        if label is None:
+                            label = mapping[value] = len(mapping) + 1
+                        out[i] = label
+                    i += 1
+            if best is None or out < best[0]:
+                best = (out, (transposed, row_order, col_order, mapping))
+
+    key, (transposed, row_order, col_order, mapping) = best
+    # Chiffres absents des indices : numérotés à la suite
+    for value in range(1, size + 1):
+        if value not in mapping:
+            mapping[value] = len(mapping) + 1
+    return bytes(key), (transposed, row_order, col_order, mapping)
+
+
+def to_canonical(grid, transform):
+    """Applique la transformation d'une forme canonique à une grille (solution) -> bytes"""
+    transposed, row_order, col_order, mapping = transform
+    oriented = _transpose(grid) if transposed else grid
+    return bytes(mapping[oriented[r][c]] for r in row_order for c in col_order)
+
+
+def from_canonical(data, transform):
+    """Transformation inverse : bytes canoniques -> grille dans le repère demandé"""
+    transposed, row_order, col_order, mapping = transform
+    size = len(row_order)
+    inverse = {label: value for value, label in mapping.items()}
+    grid = [[0] * size for _ in range(size)]
+    i = 0
+    for r in row_order:
+        for c in col_order:
+            grid[r][c] = inverse[data[i]]
+            i += 1
+    return _transpose(grid) if transposed else grid
+
+
+class SolutionCache:
+    """Cache LRU des solutions, indexé par forme canonique
+
+    Args:
+        max_entries (int): solutions conservées au plus
+        max_candidates (int): arrangements essayés pour départager les ex aequo
+    """
+
+    def __init__(self, max_entries=5000, max_candidates=256):
+        self.max_entries = max_entries
+        self.max_candidates = max_candidates
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "rejected": 0, "stored": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _footprint(key, value):
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def get(self, grid):
+        """Solution de ``grid`` (variante symétrique comprise) ou None"""
+        key, transform = canonical_form(grid, self.max_candidates)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+
+        solution = from_canonical(data, transform)
+        # ✅ Filet de sécurité : la solution ramenée doit respecter la grille demandée
+        if not validate_solution(solution, grid)[0]:
+            with self._lock:
+                self._stats["rejected"] += 1
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return solution
+
+    def put(self, grid, solution):
+        """Enregistre la solution d'une grille sous sa forme canonique"""
+        key, transform = canonical_form(grid, self.max_candidates)
+        data = to_canonical(solution, transform)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= self._footprint(key, previous)
+            self._entries[key] = data
+            self._bytes += self._footprint(key, data)
+            self._stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                old_key, old_data = self._entries.popitem(last=False)
+                self._bytes -= self._footprint(old_key, old_data)
+
+    def stats(self):
+        """Taux de succès et empreinte mémoire approximative"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries,
+                    "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                    "memory_bytes": self._bytes}
+
+    def __len__(self):
+        return len(self._entries)
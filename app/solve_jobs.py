@@ -0,0 +1,150 @@
+# ===== TÂCHES DE RÉSOLUTION ASYNCHRONES =====
+# Une résolution longue n'occupe plus une requête HTTP : le client soumet
+# la grille, reçoit un identifiant, puis interroge le statut ou suit la
+# progression en flux Server-Sent Events.
+#
+# Le registre vit dans la mémoire du processus : avec plusieurs workers
+# Gunicorn, la soumission et le suivi d'une tâche doivent arriver au même
+# worker (un seul worker, ou routage collant devant le serveur). Le flux
+# SSE garde sa requête ouverte : workers à threads (gthread) ou gevent.
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from app.solve_service import decode_grid
+
+# Statuts terminaux d'une tâche
+FINISHED = ("done", "unsolvable", "timeout", "error")
+
+
+class SolveJob:
+    """Résolution soumise au service, suivie jusqu'à son issue"""
+
+    def __init__(self, size):
+        self.id = uuid.uuid4().hex[:16]
+        self.size = size
+        self.status = "queued"
+        self.progress = {"nodes": 0, "filled": 0, "cells": size * size}
+        self.solution = None
+        self.stats = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.version = 0  # Incrémenté à chaque changement (flux SSE)
+
+    def snapshot(self):
+        data = {"id": self.id, "status": self.status, "progress": dict(self.progress),
+                "version": self.version}
+        if self.solution is not None:
+            data["solution"] = self.solution
+        if self.stats is not None:
+            data["stats"] = self.stats
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class SolveJobs:
+    """Registre des tâches de résolution, purgé des tâches terminées trop anciennes
+
+    Args:
+        service: ``SolveService`` qui exécute les résolutions
+        ttl (float): secondes de conservation d'une tâche terminée
+        max_jobs (int): tâches conservées au plus
+    """
+
+    def __init__(self, service, ttl=600, max_jobs=500):
+        self.service = service
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._changed = threading.Condition()
+
+    def submit(self, board, timeout):
+        """Crée une tâche et soumet la grille au service
+
+        Raises:
+            ServiceBusy: file du service pleine
+        """
+        job = SolveJob(len(board))
+        with self._changed:
+            self._purge()
+            self._jobs[job.id] = job
+
+        try:
+            future = self.service.submit(board, timeout, with_stats=True,
+                                         on_progress=lambda info: self._update(job, info))
+        except Exception:
+            with self._changed:
+                self._jobs.pop(job.id, None)
+            raise
+        future.add_done_callback(lambda done: self._finish(job, done, timeout))
+        return job
+
+    def _update(self, job, info):
+        with self._changed:
+            if job.status in FINISHED:
+                return
+            job.status = "running"
+            job.progress = info
+            job.version += 1
+            self._changed.notify_all()
+
+    def _finish(self, job, future, timeout):
+        error = None
+        try:
+            outcome, solution, stats = future.result()
+        except Exception as e:
+            outcome, solution, stats = "error", None, None
+            error = f"❌ Échec de la résolution : {e}"
+        with self._changed:
+            job.stats = stats
+            if outcome == "solved":
+                job.status = "done"
+                job.solution = decode_grid(solution, job.size)
+                job.progress = dict(job.progress, filled=job.size * job.size)
+            elif outcome == "unsolvable":
+                job.status = "unsolvable"
+                job.error = "Grille non résoluble"
+            elif outcome == "timeout":
+                job.status = "timeout"
+                job.error = f"⏱️ Résolution trop longue (>{timeout}s)"
+            else:
+                job.status = "error"
+                job.error = error
+            job.finished = time.time()
+            job.version += 1
+            self._changed.notify_all()
+
+    def get(self, job_id):
+        """Instantané de la tâche (dict), ou None si elle est inconnue"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job is not None else None
+
+    def wait(self, job_id, version, timeout):
+        """Attend que la tâche change de ``version`` (au plus ``timeout`` s) puis retourne son instantané"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._changed.wait_for(lambda: job.version != version, timeout=timeout)
+            return job.snapshot()
+
+    def _purge(self):
+        """Retire les tâches terminées expirées, puis les plus anciennes terminées au-delà de ``max_jobs``
+
+        Une tâche en cours n'est jamais retirée : son suivi (statut, flux SSE)
+        doit rester possible jusqu'à son issue.
+        """
+        now = time.time()
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished is not None]
+        for job_id in finished:
+            if now - self._jobs[job_id].finished > self.ttl:
+                del self._jobs[job_id]
+        for job_id in finished:
+            if len(self._jobs) < self.max_jobs:
+                break
+            self._jobs.pop(job_id, None)
@@ -0,0 +1,285 @@
+# ===== SERVICE DE RÉSOLUTION MULTI-PROCESSUS =====
+# Les résolutions lourdes (16x16, 25x25) saturent le GIL si elles tournent
+# dans des threads du serveur web. Ce service les confie à un pool de
+# processus : la grille voyage sous forme compacte (un octet par case),
+# la file est bornée (ServiceBusy -> 503) et chaque taille a sa propre
+# limite de résolutions simultanées. La progression des résolutions
+# suivies remonte des workers par une file partagée. Un cache de solutions
+# (app/solution_cache.py), consulté avant le pool, évite de relancer le
+# solveur pour une grille déjà résolue ou l'une de ses variantes symétriques.
+
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from app.sudoku import CancelToken, SolveCancelled, SolveStats, solve_sudoku
+
+logger = logging.getLogger(__name__)
+
+# Résolutions simultanées au plus par taille (absente = pas de limite propre)
+DEFAULT_SIZE_LIMITS = {16: 2, 25: 1}
+
+# ✅ Pas de fork : le serveur a déjà des threads (progression, pool de grilles,
+# requêtes) dont les verrous seraient copiés tenus dans les workers
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class ServiceBusy(Exception):
+    """File de résolution pleine : la requête doit être refusée (503)"""
+
+
+def encode_grid(board):
+    """Grille -> bytes, un octet par case (625 octets pour un 25x25)"""
+    return bytes(value for row in board for value in row)
+
+
+def decode_grid(data, size):
+    """bytes -> grille ``size`` x ``size``"""
+    return [list(data[r * size:(r + 1) * size]) for r in range(size)]
+
+
+_progress_queue = None  # File de progression, côté worker
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _progress_info(stats, size):
+    return {"nodes": stats.nodes, "filled": stats.filled, "cells": size * size}
+
+
+def _solve_in_worker(data, size, backend, deadline, with_stats, progress_key=None):
+    """Tâche exécutée dans un processus du pool
+
+    Avec ``progress_key``, la progression (noeuds explorés, cases remplies)
+    est envoyée régulièrement sur la file partagée.
+
+    Returns:
+        tuple: (issue, solution encodée ou None, statistiques ou None) ;
+        issue vaut "solved", "unsolvable" ou "timeout"
+    """
+    board = decode_grid(data, size)
+    stats = SolveStats() if with_stats else None
+    if progress_key is not None and _progress_queue is not None:
+        def report(current):
+            _progress_queue.put((progress_key, _progress_info(current, size)))
+        stats = SolveStats(progress=report)
+        stats.filled = sum(1 for value in data if value)
+        report(stats)  # Premier message : la résolution a commencé
+    # ✅ L'échéance tient compte du temps passé dans la file
+    cancel = CancelToken(max(0.0, deadline - time.time()))
+    try:
+        outcome = "solved" if solve_sudoku(board, backend, stats, cancel) else "unsolvable"
+    except SolveCancelled:
+        outcome = "timeout"
+    solution = encode_grid(board) if outcome == "solved" else None
+    return outcome, solution, stats.to_dict() if stats is not None else None
+
+
+class SolveService:
+    """Pool de processus de résolution avec file bornée et limites par taille
+
+    Args:
+        workers (int): processus du pool (défaut : nombre de cœurs)
+        max_pending (int): résolutions en file ou en cours au plus
+        size_limits (dict): taille -> résolutions simultanées au plus
+        cache: ``SolutionCache`` consulté avant le pool (None = pas de cache)
+    """
+
+    def __init__(self, workers=None, max_pending=8, size_limits=None, cache=None):
+        self.workers = workers
+        self.cache = cache
+        self.max_pending = max_pending
+        self.size_limits = DEFAULT_SIZE_LIMITS if size_limits is None else size_limits
+        self._pool = None
+        self._progress_queue = None
+        self._listeners = {}
+        self._keys = itertools.count()
+        self._pending = 0
+        self._per_size = {}
+        self._stats = {"submitted": 0, "rejected": 0, "completed": 0, "pool_restarts": 0}
+        self._lock = threading.Lock()
+        # ✅ Mises en cache (forme canonique, vérification) sur un thread dédié,
+        # pas sur le thread de gestion du pool qui exécute les callbacks
+        self._cache_writer = ThreadPoolExecutor(max_workers=1) if cache is not None else None
+
+    def _executor(self):
+        # Pool créé à la première résolution, pas à l'import du module (appelé sous le verrou)
+        if self._pool is None:
+            context = multiprocessing.get_context(START_METHOD)
+            self._progress_queue = context.Queue()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                             initializer=_init_worker, initargs=(self._progress_queue,))
+            threading.Thread(target=self._dispatch_progress, args=(self._progress_queue,), daemon=True).start()
+        return self._pool
+
+    def _discard_pool(self, pool):
+        """Abandonne un pool cassé (worker tué, par ex. par l'OOM killer) ; appelé sous le verrou
+
+        Le pool suivant est recréé par ``_executor`` à la prochaine soumission.
+        """
+        if self._pool is not pool:
+            return  # Déjà remplacé
+        logger.warning("⚠️ Pool de résolution cassé : recréé à la prochaine résolution")
+        self._pool = None
+        self._stats["pool_restarts"] += 1
+        # Pas de shutdown : le pool cassé a déjà terminé ses workers et échoué ses tâches
+        self._progress_queue.put(None)  # Arrête le thread de progression de l'ancien pool
+
+    def _dispatch_progress(self, progress_queue):
+        """Thread de fond : transmet les messages de progression aux abonnés"""
+        while True:
+            item = progress_queue.get()
+            if item is None:
+                return
+            key, info = item
+            with self._lock:
+                listener = self._listeners.get(key)
+            if listener is not None:
+                listener(info)
+
+    def submit(self, board, timeout, backend=None, with_stats=False, on_progress=None, use_cache=True):
+        """Soumet une grille ; retourne un Future de ``(issue, solution encodée ou None, stats)``
+
+        ``on_progress(info)`` reçoit, depuis un thread de fond, les messages
+        ``{"nodes", "filled", "cells"}`` envoyés par le worker. Une grille
+        trouvée dans le cache donne un Future déjà terminé (stats à None).
+
+        Raises:
+            ServiceBusy: file pleine ou trop de résolutions de cette taille
+        """
+        size = len(board)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(board)
+            if cached is not None:
+                future = Future()
+                future.set_result(("solved", encode_grid(cached), None))
+                return future
+        key = next(self._keys) if on_progress is not None else None
+        with self._lock:
+            limit = self.size_limits.get(size)
+            if self._pending >= self.max_pending or \
+                    (limit is not None and self._per_size.get(size, 0) >= limit):
+                self._stats["rejected"] += 1
+                raise ServiceBusy(f"File de résolution pleine ({size}x{size})")
+            args = (encode_grid(board), size, backend, time.time() + timeout, with_stats, key)
+            try:
+                pool = self._executor()
+                try:
+                    future = pool.submit(_solve_in_worker, *args)
+                except BrokenProcessPool:
+                    # ✅ Pool cassé depuis la dernière résolution : un pool neuf prend le relais
+                    self._discard_pool(pool)
+                    pool = self._executor()
+                    future = pool.submit(_solve_in_worker, *args)
+            except RuntimeError:
+                # Pool arrêté (fin du serveur) ou cassé aussitôt recréé
+                logger.exception("❌ Pool de résolution indisponible")
+                raise ServiceBusy("Pool de résolution indisponible")
+            self._pending += 1
+            self._per_size[size] = self._per_size.get(size, 0) + 1
+            self._stats["submitted"] += 1
+            if key is not None:
+                self._listeners[key] = on_progress
+
+        def release(done):
+            # Thread de gestion du pool : comptes des places seulement, rien de coûteux
+            failed = not done.cancelled() and done.exception() is not None
+            with self._lock:
+                self._pending -= 1
+                self._per_size[size] -= 1
+                self._stats["completed"] += 1
+                self._listeners.pop(key, None)
+                if failed and isinstance(done.exception(), BrokenProcessPool):
+                    self._discard_pool(pool)
+            if self._cache_writer is not None and not done.cancelled() and not failed:
+                outcome, solution, _ = done.result()
+                if outcome == "solved":
+                    try:
+                        self._cache_writer.submit(self.cache.put, board, decode_grid(solution, size))
+                    except RuntimeError:
+                        pass  # Service arrêté : la solution n'est simplement pas mise en cache
+
+        future.add_done_callback(release)
+        return future
+
+    def solve(self, board, timeout, backend=None, with_stats=False, use_cache=True):
+        """Résolution bloquante : ``(issue, grille résolue ou None, stats)``
+
+        Raises:
+            ServiceBusy: file pleine ou trop de résolutions de cette taille
+        """
+        future = self.submit(board, timeout, backend, with_stats, use_cache=use_cache)
+        # Petite marge : le worker s'arrête de lui-même à l'échéance
+        outcome, solution, stats = future.result(timeout=timeout + 5)
+        return outcome, decode_grid(solution, len(board)) if solution is not None else None, stats
+
+    def solve_batch(self, boards, timeout, total_timeout=None, backend=None):
+        """Résout plusieurs grilles sur le pool ; génère ``(index, issue, grille ou None)``
+        dans l'ordre d'achèvement
+
+        Un lot occupe au plus la moitié de la file, pour laisser passer les
+        résolutions isolées ; les grilles attendent qu'une place se libère.
+        Celles qui n'ont pas démarré au bout de ``total_timeout`` secondes
+        (défaut : ``timeout``) sortent avec l'issue "timeout". Les résolutions
+        en attente sont annulées si le générateur est abandonné.
+        """
+        end = time.time() + (total_timeout or timeout)
+        max_inflight = max(1, self.max_pending // 2)
+        waiting = deque(range(len(boards)))
+        running = {}
+        try:
+            while waiting or running:
+                while waiting and len(running) < max_inflight and time.time() < end:
+                    try:
+                        future = self.submit(boards[waiting[0]], min(timeout, end - time.time()), backend)
+                    except ServiceBusy:
+                        break
+                    running[future] = waiting.popleft()
+                if not running:
+                    if time.time() >= end:
+                        while waiting:
+                            yield waiting.popleft(), "timeout", None
+                        return
+                    time.sleep(0.05)  # File occupée par d'autres requêtes
+                    continue
+                done, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                if not done and time.time() > end + 5:
+                    # Même marge que ``solve`` : les workers auraient dû s'arrêter d'eux-mêmes
+                    for index in list(running.values()) + list(waiting):
+                        yield index, "timeout", None
+                    return
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        outcome, solution, _ = future.result()
+                    except Exception:
+                        logger.exception(f"❌ Échec de la résolution {index} du lot")
+                        outcome, solution = "error", None
+                    yield index, outcome, decode_grid(solution, len(boards[index])) if solution is not None else None
+        finally:
+            for future in running:
+                future.cancel()
+
+    def stats(self):
+        """Résolutions soumises, refusées, terminées et en cours par taille, cache compris"""
+        with self._lock:
+            stats = {**self._stats, "pending": self._pending, "max_pending": self.max_pending,
+                     "running": {f"{size}x{size}": n for size, n in sorted(self._per_size.items()) if n}}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._progress_queue.put(None)
+        if self._cache_writer is not None:
+            self._cache_writer.shutdown(wait=False)
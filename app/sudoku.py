@@ -1,59 +1,138 @@
 import random
 import copy
-from typing import List, Set, Tuple, Optional
+from typing import List, Optional
 import time
 import logging
+import threading
+import uuid
+
+from app.techniques import GUESS_RATING, graded_techniques, ordered_techniques
 
 # ✅ Configuration du logging pour sortie propre
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
-def generate_sudoku(difficulty="easy", size=9):
-    if size not in [4, 9, 16, 25]:
-        size = 9
+class Puzzle:
+    """Grille générée, accompagnée de la solution complète dont elle est issue"""
 
-    base = int(size ** 0.5)
-    if base * base != size:
-        raise ValueError("La taille doit être un carré parfait (ex: 4, 9, 16, 25)")
+    def __init__(self, grid, solution, difficulty, size, puzzle_id=None, grade=None):
+        self.id = puzzle_id or uuid.uuid4().hex[:16]
+        self.grid = grid
+        self.solution = solution
+        self.difficulty = difficulty
+        self.size = size
+        self.grade = grade  # Résultat de ``grade_puzzle`` quand la grille a été notée
 
-    def pattern(r, c): return (base * (r % base) + r // base + c) % size
-    def shuffle(s): return random.sample(s, len(s))
+    def __repr__(self):
+        return f"Puzzle({self.id}, {self.size}x{self.size}, {self.difficulty})"
 
-    rBase = range(base)
-    rows = [g * base + r for g in shuffle(rBase) for r in shuffle(rBase)]
-    cols = [g * base + c for g in shuffle(rBase) for c in shuffle(rBase)]
-    nums = shuffle(range(1, size + 1))
+# Niveaux proposés pour chaque taille (16x16 et 25x25 sont bridés)
+DIFFICULTY_LEVELS = {
+    4: ["easy", "medium", "hard", "expert", "extreme"],
+    9: ["easy", "medium", "hard", "expert", "extreme"],
+    16: ["easy", "medium", "hard"],
+    25: ["easy", "medium"],
+}
+
+# Note visée par difficulté : hardest_rating doit tomber dans ]min, max]
+#   <= 1.5 : singletons cachés      2.3 : singletons nus
+#   2.6 - 3.0 : candidats verrouillés, paires nues
+#   3.2 - 4.0 : X-Wing, paires cachées, triplets, Swordfish
+#   5.0    : hypothèse nécessaire
+# ✅ Bornes à mi-chemin entre deux notes de techniques (app/techniques.py) :
+# un léger ajustement d'une note ne fait pas basculer toute une classe de grilles
+GRADE_BANDS = {
+    "easy": (0.0, 1.9),
+    "medium": (1.9, 2.45),
+    "hard": (2.45, 3.1),
+    "expert": (3.1, 4.5),
+    "extreme": (4.5, GUESS_RATING),
+}
+GRADE_ATTEMPTS = 3  # Passes de génération au plus pour atteindre la bande
+# Échanges d'indices au plus par passe pour rapprocher la note de la bande (par taille)
+GRADE_SWAPS = {9: 200, 16: 60, 25: 20}
 
-    board = [[nums[pattern(r, c)] for c in cols] for r in rows]
+def band_distance(score, band):
+    """Écart entre une note et une bande ]min, max] (0 dans la bande)"""
+    if score <= band[0]:
+        return band[0] - score
+    return max(0.0, score - band[1])
 
+def difficulty_for_score(score, size):
+    """Niveau proposé pour cette taille dont la bande contient la note (le plus haut sinon)"""
+    levels = DIFFICULTY_LEVELS[size]
+    for level in levels:
+        if score <= GRADE_BANDS[level][1]:
+            return level
+    return levels[-1]
+
+def difficulty_empties(difficulty, size):
+    """Nombre de cases à vider pour une difficulté et une taille données"""
     # ✅ CORRECTION : Ratios de difficulté adaptés selon la taille
     squares = size * size
     
     if size >= 25:
         # ✅ Pour 25x25 : SEULEMENT Facile et Moyen
-        empties = {
+        return {
             "easy": int(squares * 0.35),      # 35% - Facile
-            "medium": int(squares * 0.42),    # 42% - Moyen
+            "medium": int(squares * 0.47),    # 47% - Moyen
             # Plus de niveaux difficiles pour 25x25
         }.get(difficulty, int(squares * 0.35))  # Par défaut : facile
     elif size >= 16:
         # ✅ Pour 16x16 : SEULEMENT Facile, Moyen, Difficile
-        empties = {
+        return {
             "easy": int(squares * 0.38),      # 38% - Facile
-            "medium": int(squares * 0.45),    # 45% - Moyen  
-            "hard": int(squares * 0.50),      # 50% - Difficile
+            "medium": int(squares * 0.53),    # 53% - Moyen
+            "hard": int(squares * 0.585),     # 58,5% - Difficile (au-delà, l'unicité devient très coûteuse à vérifier)
             # Plus de niveaux expert/extreme pour 16x16
         }.get(difficulty, int(squares * 0.38))  # Par défaut : facile
     else:
-        # Pour 4x4 et 9x9 : ratios originaux
-        empties = {
+        # Pour 4x4 et 9x9 : ratios originaux (moyen relevé : à 50 %, les
+        # singletons cachés suffisent presque toujours, la bande n'est pas atteinte)
+        return {
             "easy": int(squares * 0.4),
-            "medium": int(squares * 0.5),
+            "medium": int(squares * 0.57),
             "hard": int(squares * 0.6),
             "expert": int(squares * 0.65),
             "extreme": int(squares * 0.7)
         }.get(difficulty, int(squares * 0.5))
 
+def generate_sudoku(difficulty="easy", size=9, unique=False):
+    """Génère une grille à jouer (sans sa solution, voir ``generate_puzzle``)"""
+    return generate_puzzle(difficulty, size, unique).grid
+
+def generate_puzzle(difficulty="easy", size=9, unique=False):
+    """Génère une grille et conserve la solution complète ayant servi à la construire
+
+    Avec ``unique=True``, la grille produite admet exactement une solution.
+    """
+    if size not in [4, 9, 16, 25]:
+        size = 9
+
+    board = _random_solution(size)
+    base = int(size ** 0.5)
+    squares = size * size
+    empties = difficulty_empties(difficulty, size)
+
+    if unique:
+        puzzle = _generate_unique_puzzle(board, empties, difficulty, size)
+        if puzzle.grade is None:
+            return puzzle
+        # Quelques passes de plus si la note reste hors bande, en gardant la plus proche
+        band = GRADE_BANDS[difficulty]
+        for attempt in range(1, GRADE_ATTEMPTS):
+            if band_distance(puzzle.grade["score"], band) == 0:
+                break
+            retry = _generate_unique_puzzle(_random_solution(size), empties, difficulty, size)
+            if band_distance(retry.grade["score"], band) < band_distance(puzzle.grade["score"], band):
+                puzzle = retry
+        if band_distance(puzzle.grade["score"], band):
+            # ✅ Bande non atteinte : la grille porte le niveau de la note obtenue
+            puzzle.difficulty = difficulty_for_score(puzzle.grade["score"], size)
+            logger.info(f"⚠️ Note visée {band} non atteinte pour {difficulty} "
+                        f"({puzzle.grade['score']}) : grille classée {puzzle.difficulty}")
+        return puzzle
+
     # ✅ Génération intelligente pour éviter les grilles impossibles
     max_attempts = 50
     for attempt in range(max_attempts):
@@ -93,265 +172,968 @@ def generate_sudoku(difficulty="easy", size=9):
         
         # ✅ Vérifier que la grille est solvable
         verification_board = copy.deepcopy(test_board)
-        if solve_sudoku_verification(verification_board):
+        outcome = verify_sudoku(verification_board)
+        if outcome == VERIFY_SOLVED:
             logger.info(f"✅ Grille {size}x{size} {difficulty} générée (tentative {attempt + 1})")
-            return test_board
-        else:
-            logger.info(f"❌ Grille impossible, nouvelle tentative ({attempt + 1}/{max_attempts})")
+            return Puzzle(test_board, board, difficulty, size)
+        if outcome == VERIFY_TIMEOUT:
+            # La grille est issue d'une solution complète : un délai dépassé
+            # n'est pas une impossibilité, inutile de la jeter
+            logger.info(f"⏱️ Vérification interrompue, grille {size}x{size} {difficulty} conservée")
+            return Puzzle(test_board, board, difficulty, size)
+        logger.info(f"❌ Grille impossible, nouvelle tentative ({attempt + 1}/{max_attempts})")
     
     # Si aucune grille valide trouvée, générer une grille plus facile
     logger.warning(f"⚠️ Génération difficile en mode {difficulty}, passage en mode facile")
     fallback_empties = int(squares * (0.35 if size >= 25 else 0.4))
+    fallback_board = copy.deepcopy(board)
     for p in random.sample(range(squares), fallback_empties):
-        board[p // size][p % size] = 0
+        fallback_board[p // size][p % size] = 0
     
-    return board
+    return Puzzle(fallback_board, board, difficulty, size)
+
+def _random_solution(size):
+    """Grille complète valide obtenue en mélangeant un motif de base"""
+    base = int(size ** 0.5)
+    if base * base != size:
+        raise ValueError("La taille doit être un carré parfait (ex: 4, 9, 16, 25)")
+
+    def pattern(r, c): return (base * (r % base) + r // base + c) % size
+    def shuffle(s): return random.sample(s, len(s))
+
+    rBase = range(base)
+    rows = [g * base + r for g in shuffle(rBase) for r in shuffle(rBase)]
+    cols = [g * base + c for g in shuffle(rBase) for c in shuffle(rBase)]
+    nums = shuffle(range(1, size + 1))
+
+    return [[nums[pattern(r, c)] for c in cols] for r in rows]
+
+def transform_puzzle(puzzle, rng=None):
+    """Variante équivalente d'une grille, en O(n²) et sans solveur
+
+    Chiffres renommés, bandes et piles permutées, lignes et colonnes
+    permutées dans leur bande, puis rotation d'un quart de tour (0 à 3 fois)
+    et transposition éventuelle. Ces symétries conservent l'unicité de la
+    solution et la difficulté : la note de la grille d'origine est reprise.
+    """
+    rng = rng or random
+    size = puzzle.size
+    base = int(size ** 0.5)
+
+    def shuffle(s): return rng.sample(s, len(s))
+
+    rBase = range(base)
+    rows = [g * base + r for g in shuffle(rBase) for r in shuffle(rBase)]
+    cols = [g * base + c for g in shuffle(rBase) for c in shuffle(rBase)]
+    nums = [0] + shuffle(range(1, size + 1))
+    turns = rng.randrange(4)
+    transpose = rng.random() < 0.5
+
+    def source(r, c):
+        # Case d'origine de la case (r, c) : transposition, puis rotation, puis permutations
+        if transpose:
+            r, c = c, r
+        for _ in range(turns):
+            r, c = size - 1 - c, r
+        return rows[r], cols[c]
+
+    cells = [[source(r, c) for c in range(size)] for r in range(size)]
+    grid = [[nums[puzzle.grid[sr][sc]] for sr, sc in line] for line in cells]
+    solution = [[nums[puzzle.solution[sr][sc]] for sr, sc in line] for line in cells]
+    grade = dict(puzzle.grade) if puzzle.grade is not None else None
+    return Puzzle(grid, solution, puzzle.difficulty, size, grade=grade)
+
+def _removal_order(size):
+    """Ordre aléatoire des cases à vider (réparti bloc par bloc pour 16x16 et plus)"""
+    squares = size * size
+    if size < 16:
+        return random.sample(range(squares), squares)
+
+    base = int(size ** 0.5)
+    blocks = []
+    for block_r in range(base):
+        for block_c in range(base):
+            cells = [r * size + c
+                     for r in range(block_r * base, (block_r + 1) * base)
+                     for c in range(block_c * base, (block_c + 1) * base)]
+            random.shuffle(cells)
+            blocks.append(cells)
+    random.shuffle(blocks)
+    # Une case par bloc à chaque tour pour garder une répartition homogène
+    return [cells[i] for i in range(size) for cells in blocks]
+
+def _generate_unique_puzzle(board, empties, difficulty, size):
+    """Vide ``empties`` cases une à une en conservant une solution unique
+
+    Après chaque retrait, le solveur DLX compte les solutions en s'arrêtant
+    à 2 ; si la grille devient ambiguë, seul ce retrait est annulé.
+
+    À partir de 9x9, la grille est ensuite notée (``grade_puzzle``) : tant que
+    la note est hors de la bande visée, un indice est remis et une autre case
+    vidée (``GRADE_SWAPS`` essais au plus, nombre de cases vides inchangé),
+    en gardant l'échange s'il n'éloigne pas la note de la bande.
+    """
+    start_time = time.time()
+    grid = [row[:] for row in board]
+    band = GRADE_BANDS.get(difficulty) if size >= 9 else None
+    removed = 0
+    checks = 0
+    grade = None
+
+    for p in _removal_order(size):
+        if removed >= empties:
+            break  # ✅ Nombre de cases vides visé atteint
+        r, c = divmod(p, size)
+        value = grid[r][c]
+        grid[r][c] = 0
+        checks += 1
+        if count_solutions(grid, 2) != 1:
+            grid[r][c] = value  # ✅ Annuler uniquement ce retrait
+            continue
+        removed += 1
+
+    if band is not None:
+        grade = grade_puzzle(grid)
+        squares = size * size
+        for _ in range(GRADE_SWAPS.get(size, 0)):
+            distance = band_distance(grade["score"], band)
+            if distance == 0:
+                break
+            given = random.choice([i for i in range(squares) if grid[i // size][i % size]])
+            hole = random.choice([i for i in range(squares) if not grid[i // size][i % size]])
+            grid[given // size][given % size] = 0
+            grid[hole // size][hole % size] = board[hole // size][hole % size]
+            candidate = grade_puzzle(grid)
+            if band_distance(candidate["score"], band) <= distance:
+                # ✅ Une grille résolue par la seule logique a une solution unique :
+                # le comptage DLX (le plus coûteux) ne sert qu'aux grilles à hypothèse
+                if candidate["logical"]:
+                    grade = candidate
+                    continue
+                checks += 1
+                if count_solutions(grid, 2) == 1:
+                    grade = candidate
+                    continue
+            # Échange refusé : note plus éloignée ou grille ambiguë
+            grid[given // size][given % size] = board[given // size][given % size]
+            grid[hole // size][hole % size] = 0
+
+    if removed < empties:
+        logger.info(f"⚠️ Grille unique limitée à {removed}/{empties} cases vides")
+    logger.info(f"✅ Grille unique {size}x{size} {difficulty} générée "
+                f"({checks} vérifications, {time.time() - start_time:.2f}s)")
+    return Puzzle(grid, board, difficulty, size, grade=grade)
+
+def grade_puzzle(grid):
+    """Note une grille comme un joueur humain la résoudrait
+
+    À chaque étape, la technique la plus simple disponible est appliquée
+    partout où elle s'applique ; la note de la grille est celle de la
+    technique la plus difficile qu'il a fallu utiliser.
+
+    Returns:
+        dict: ``score`` (note), ``hardest`` (technique), ``steps`` (étapes),
+        ``logical`` (False si une hypothèse est nécessaire)
+    """
+    board = [row[:] for row in grid]
+    solver = UltraSudokuSolver(board, techniques=[])
+    solver.queue.clear()
+    ranked = graded_techniques()
+    score, hardest, steps = 0.0, None, 0
+
+    while solver.empty_cells and solver.consistent:
+        for name, rating, technique, place in ranked:
+            moves = technique(solver)
+            if moves:
+                break
+        else:
+            break  # Plus aucune technique ne progresse
+
+        steps += 1
+        if rating > score:
+            score, hardest = rating, name
+        for i, value in moves:
+            if place:
+                r, c = divmod(i, solver.size)
+                if board[r][c] == 0 and solver.cand[i] >> (value - 1) & 1:
+                    solver._place(r, c, value)
+            elif solver.cand[i] & value:
+                solver._eliminate(i, value)
+        solver.queue.clear()
+
+    if solver.empty_cells:
+        return {"score": GUESS_RATING, "hardest": "guess", "steps": steps, "logical": False}
+    return {"score": score, "hardest": hardest, "steps": steps, "logical": True}
+
+# Issues possibles d'une vérification bornée dans le temps
+VERIFY_SOLVED = "solved"
+VERIFY_UNSOLVABLE = "unsolvable"
+VERIFY_TIMEOUT = "timeout"
+
+def verify_sudoku(board, timeout_seconds=15):
+    """Vérifie la solvabilité (recherche complète) et retourne l'une des trois issues
+
+    Un délai dépassé (VERIFY_TIMEOUT) ne dit rien de la grille : ce n'est
+    pas une preuve d'impossibilité.
+    """
+    return UltraSudokuSolver(board).verify(timeout_seconds)
 
 def solve_sudoku_verification(board):
     """Version rapide du solveur juste pour vérifier la solvabilité"""
-    size = len(board)
-    
-    if size <= 9:
-        return solve_sudoku_classic_fast_check(board)
-    else:
-        # Pour les grandes grilles, utiliser un timeout plus court
-        solver = UltraSudokuSolver(board)
-        return solver.solve_with_timeout(15)  # 15 secondes max pour vérification
+    return verify_sudoku(board) == VERIFY_SOLVED
+
+class SolveCancelled(Exception):
+    """Résolution interrompue par son jeton d'annulation"""
+
+class CancelToken:
+    """Jeton d'annulation coopératif partagé entre l'appelant et un solveur
+
+    Le solveur appelle ``check()`` à chaque noeud de recherche ; l'appelant
+    appelle ``cancel()`` (ou fixe un ``timeout``) pour libérer le worker au
+    lieu de laisser la résolution tourner sans fin.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._event = threading.Event()
+        self.deadline = time.time() + timeout if timeout is not None else None
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.deadline is not None and time.time() > self.deadline)
+
+    def check(self):
+        """Lève ``SolveCancelled`` si l'annulation a été demandée"""
+        if self.cancelled:
+            raise SolveCancelled()
+
+class SolveStats:
+    """Compteurs de recherche remplis par les solveurs quand on leur en passe un
+
+    Sans objet ``stats`` (cas normal), les solveurs ne font qu'un test
+    ``is not None`` par noeud : coût négligeable.
+
+    ``progress`` (optionnel) est appelé avec cet objet au plus toutes les
+    ``progress_interval`` secondes pendant la recherche.
+    """
+
+    def __init__(self, progress=None, progress_interval: float = 0.25):
+        self.solved = False
+        self.backend = None
+        self.nodes = 0        # Noeuds de recherche visités
+        self.backtracks = 0   # Candidats essayés puis annulés
+        self.max_depth = 0
+        self.filled = 0       # Cases remplies au dernier noeud visité
+        self.techniques = {}  # Technique logique -> cases trouvées
+        self.phases = {}      # Phase -> secondes
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self._next_progress = 0.0
+
+    def enter(self, depth: int, filled: Optional[int] = None):
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if filled is not None:
+            self.filled = filled
+        if self.progress is not None:
+            now = time.time()
+            if now >= self._next_progress:
+                self._next_progress = now + self.progress_interval
+                self.progress(self)
+
+    def found(self, technique: str, count: int = 1):
+        self.techniques[technique] = self.techniques.get(technique, 0) + count
+
+    def add_time(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def to_dict(self):
+        return {
+            "solved": self.solved,
+            "backend": self.backend,
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "techniques": dict(self.techniques),
+            "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()},
+        }
+
+def _iter_digits(mask: int):
+    """Itère les chiffres (1..n) présents dans un masque de bits, du plus petit au plus grand"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length()
+        mask ^= low
+
+
+_GEOMETRY_CACHE = {}
+
+def _grid_geometry(size: int):
+    """Unités de chaque case, cases de chaque unité et voisins (mis en cache par taille)
+
+    Unités numérotées : lignes 0..n-1, colonnes n..2n-1, blocs 2n..3n-1.
+    """
+    if size not in _GEOMETRY_CACHE:
+        bs = int(size ** 0.5)
+        units_of = []
+        unit_cells = [[] for _ in range(3 * size)]
+        for i in range(size * size):
+            r, c = divmod(i, size)
+            units = (r, size + c, 2 * size + (r // bs) * bs + c // bs)
+            units_of.append(units)
+            for u in units:
+                unit_cells[u].append(i)
+        peers = []
+        for i, units in enumerate(units_of):
+            neighbours = set()
+            for u in units:
+                neighbours.update(unit_cells[u])
+            neighbours.discard(i)
+            peers.append(sorted(neighbours))
+        _GEOMETRY_CACHE[size] = (units_of, unit_cells, peers)
+    return _GEOMETRY_CACHE[size]
+
 
 class UltraSudokuSolver:
-    """Solveur Sudoku ultra-optimisé spécial 25x25"""
+    """Solveur Sudoku ultra-optimisé spécial 25x25
+
+    Les chiffres libres de chaque ligne, colonne et bloc (``unit_free``) sont
+    des masques de bits : le bit ``num - 1`` est à 1 si ``num`` peut encore y être placé.
+    Chaque case vide garde son propre masque (``cand``) et, pour chaque
+    couple (unité, chiffre), ``counts`` compte les cases où le chiffre reste
+    possible. Ces compteurs sont mis à jour à chaque élimination : les
+    singletons nus et cachés arrivent dans une file de travail au lieu
+    d'être recherchés en rebalayant toute la grille.
+    Chaque modification est notée dans ``trail`` ; le retour arrière dépile ce
+    journal (LIFO) au lieu de restaurer des copies complètes de l'état.
+    Quand les singletons ne suffisent plus, les techniques avancées
+    (``app.techniques``, des moins chères aux plus chères) éliminent des
+    candidats avant de brancher ; ``techniques=[]`` les désactive.
+    """
     
-    def __init__(self, board: List[List[int]]):
+    def __init__(self, board: List[List[int]], stats: Optional[SolveStats] = None,
+                 techniques=None, cancel: Optional[CancelToken] = None):
         self.size = len(board)
         self.block_size = int(self.size ** 0.5)
         self.board = board  # ✅ RÉFÉRENCE DIRECTE
+        self.stats = stats
+        self.cancel = cancel
         
-        # ✅ Structures de données ultra-optimisées
-        self.row_candidates = [set(range(1, self.size + 1)) for _ in range(self.size)]
-        self.col_candidates = [set(range(1, self.size + 1)) for _ in range(self.size)]
-        self.block_candidates = [[set(range(1, self.size + 1)) for _ in range(self.block_size)] 
-                                for _ in range(self.block_size)]
+        # ✅ Masques de bits : chiffres pas encore placés, par unité (lignes, colonnes, blocs)
+        full_mask = (1 << self.size) - 1
+        self.unit_free = [full_mask] * (3 * self.size)
+        self.units_of, self.unit_cells, self.peers = _grid_geometry(self.size)
         
-        # Cache des cellules vides triées par difficulté
-        self.empty_cells = []
-        self.cell_candidates_cache = {}
+        # Candidats par case (0 pour une case remplie) et compteurs (unité, chiffre)
+        self.cand = [0] * (self.size * self.size)
+        self.counts = [0] * (3 * self.size * self.size)
+        # Vue transposée pour les techniques avancées : cases où chaque chiffre reste candidat
+        self.digit_cells = [0] * self.size
+        
+        # Cellules vides et nombre de cases vides par ligne / colonne (heuristique de degré)
+        self.empty_cells = set()
+        self.row_empty = [0] * self.size
+        self.col_empty = [0] * self.size
+        
+        # Journal des modifications, annulées dans l'ordre inverse :
+        #   (case, bit)             -> élimination d'un candidat
+        #   (case, num, candidats)  -> placement
+        self.trail = []
+        # File des singletons à examiner : (case,) ou (unité, chiffre - 1)
+        self.queue = []
+        self.consistent = True
+        self.timed_out = False
+        self.techniques = ordered_techniques() if techniques is None else ordered_techniques(techniques)
         
         self._initialize_fast()
     
     def _initialize_fast(self):
         """Initialisation ultra-rapide avec précalcul"""
+        n = self.size
         # Phase 1: Retirer les nombres déjà placés des candidats
-        for r in range(self.size):
-            for c in range(self.size):
+        for r in range(n):
+            for c in range(n):
                 val = self.board[r][c]
                 if val != 0:
-                    self.row_candidates[r].discard(val)
-                    self.col_candidates[c].discard(val)
-                    self.block_candidates[r // self.block_size][c // self.block_size].discard(val)
+                    if not self._get_unit_mask(r, c) & (1 << (val - 1)):
+                        self.consistent = False  # Indices contradictoires
+                    self._update_constraints(r, c, val)
                 else:
-                    self.empty_cells.append((r, c))
+                    self.empty_cells.add((r, c))
+                    self.row_empty[r] += 1
+                    self.col_empty[c] += 1
         
-        # Phase 2: Calculer et mettre en cache les candidats de chaque cellule vide
+        # Phase 2: Candidats de chaque cellule vide et compteurs par unité
+        counts = self.counts
         for r, c in self.empty_cells:
-            candidates = (self.row_candidates[r] & 
-                         self.col_candidates[c] & 
-                         self.block_candidates[r // self.block_size][c // self.block_size])
-            self.cell_candidates_cache[(r, c)] = candidates
+            i = r * n + c
+            candidates = self._get_unit_mask(r, c)
+            self.cand[i] = candidates
+            for num in _iter_digits(candidates):
+                self.digit_cells[num - 1] |= 1 << i
+                for u in self.units_of[i]:
+                    counts[u * n + num - 1] += 1
+            if candidates & (candidates - 1) == 0:
+                self.queue.append((i,))  # Singleton nu (ou contradiction)
+        
+        # Phase 3: Singletons cachés déjà présents
+        for u in range(3 * n):
+            for num in _iter_digits(self.unit_free[u]):
+                count = counts[u * n + num - 1]
+                if count == 1:
+                    self.queue.append((u, num - 1))
+                elif count == 0:
+                    self.consistent = False  # Chiffre impossible à placer dans cette unité
     
     def _update_constraints(self, r: int, c: int, num: int, remove: bool = True):
         """Met à jour les contraintes de façon ultra-efficace"""
+        bit = 1 << (num - 1)
+        n = self.size
+        b = 2 * n + (r // self.block_size) * self.block_size + c // self.block_size
         if remove:
-            self.row_candidates[r].discard(num)
-            self.col_candidates[c].discard(num)
-            self.block_candidates[r // self.block_size][c // self.block_size].discard(num)
+            self.unit_free[r] &= ~bit
+            self.unit_free[n + c] &= ~bit
+            self.unit_free[b] &= ~bit
         else:
-            self.row_candidates[r].add(num)
-            self.col_candidates[c].add(num)
-            self.block_candidates[r // self.block_size][c // self.block_size].add(num)
+            self.unit_free[r] |= bit
+            self.unit_free[n + c] |= bit
+            self.unit_free[b] |= bit
+    
+    def _get_unit_mask(self, r: int, c: int) -> int:
+        """Chiffres encore absents de la ligne, de la colonne et du bloc de (r, c)"""
+        row, col, block = self.units_of[r * self.size + c]
+        return self.unit_free[row] & self.unit_free[col] & self.unit_free[block]
+    
+    def _get_candidates(self, r: int, c: int) -> int:
+        """Récupération ultra-rapide des candidats (masque de bits)"""
+        return self.cand[r * self.size + c]
+    
+    def _eliminate(self, i: int, bit: int) -> bool:
+        """Retire un candidat d'une case ; False si cela crée une contradiction"""
+        n = self.size
+        counts = self.counts
+        unit_free = self.unit_free
+        remaining = self.cand[i] & ~bit
+        self.cand[i] = remaining
+        self.trail.append((i, bit))
+        
+        ok = True
+        d = bit.bit_length() - 1
+        self.digit_cells[d] &= ~(1 << i)
+        for u in self.units_of[i]:
+            k = u * n + d
+            count = counts[k] - 1
+            counts[k] = count
+            if count <= 1 and unit_free[u] & bit:
+                if count == 1:
+                    self.queue.append((u, d))  # Singleton caché
+                else:
+                    ok = False  # Plus aucune place pour ce chiffre
+        if remaining & (remaining - 1) == 0:
+            if remaining:
+                self.queue.append((i,))  # Singleton nu
+            else:
+                ok = False
+        return ok
     
-    def _get_candidates(self, r: int, c: int) -> Set[int]:
-        """Récupération ultra-rapide des candidats"""
-        return (self.row_candidates[r] & 
-                self.col_candidates[c] & 
-                self.block_candidates[r // self.block_size][c // self.block_size])
+    def _place(self, r: int, c: int, num: int) -> bool:
+        """Place un nombre, élimine ce candidat chez les voisins et note tout dans le journal"""
+        n = self.size
+        i = r * n + c
+        bit = 1 << (num - 1)
+        counts = self.counts
+        unit_free = self.unit_free
+        old = self.cand[i]
+        
+        self.board[r][c] = num
+        self.empty_cells.discard((r, c))
+        self.row_empty[r] -= 1
+        self.col_empty[c] -= 1
+        self._update_constraints(r, c, num)
+        self.cand[i] = 0
+        self.trail.append((i, num, old))
+        
+        ok = True
+        # La case quitte ses unités : ses autres candidats y perdent une place
+        cell = 1 << i
+        for d in range(n):
+            if old >> d & 1:
+                self.digit_cells[d] &= ~cell
+                for u in self.units_of[i]:
+                    k = u * n + d
+                    count = counts[k] - 1
+                    counts[k] = count
+                    if count <= 1 and unit_free[u] >> d & 1:
+                        if count == 1:
+                            self.queue.append((u, d))
+                        else:
+                            ok = False
+        
+        # Propagation directe aux voisins
+        cand = self.cand
+        for j in self.peers[i]:
+            if cand[j] & bit:
+                if not self._eliminate(j, bit):
+                    ok = False
+        return ok
+    
+    def _undo(self, mark: int):
+        """Annule les modifications notées après ``mark`` (ordre LIFO)"""
+        n = self.size
+        trail = self.trail
+        counts = self.counts
+        cand = self.cand
+        digit_cells = self.digit_cells
+        while len(trail) > mark:
+            entry = trail.pop()
+            i = entry[0]
+            units = self.units_of[i]
+            if len(entry) == 2:
+                bit = entry[1]
+                cand[i] |= bit
+                d = bit.bit_length() - 1
+                digit_cells[d] |= 1 << i
+                for u in units:
+                    counts[u * n + d] += 1
+            else:
+                _, num, old = entry
+                r, c = divmod(i, n)
+                self.board[r][c] = 0
+                self.empty_cells.add((r, c))
+                self.row_empty[r] += 1
+                self.col_empty[c] += 1
+                self._update_constraints(r, c, num, remove=False)
+                cand[i] = old
+                for d in range(n):
+                    if old >> d & 1:
+                        digit_cells[d] |= 1 << i
+                        for u in units:
+                            counts[u * n + d] += 1
+    
+    def _select_cell(self):
+        """MRV + degré en une passe : moins de candidats, puis lignes/colonnes les plus vides"""
+        best = None
+        best_key = None
+        n = self.size
+        cand = self.cand
+        row_empty = self.row_empty
+        col_empty = self.col_empty
+        for r, c in self.empty_cells:
+            count = cand[r * n + c].bit_count()
+            if count <= 1:
+                return r, c  # Case forcée ou contradiction : inutile de chercher mieux
+            key = (count, -(row_empty[r] + col_empty[c]))
+            if best_key is None or key < best_key:
+                best, best_key = (r, c), key
+        return best
     
     def _solve_logical_techniques(self) -> bool:
-        """Application des techniques logiques avancées"""
-        progress = True
-        iterations = 0
-        max_iterations = self.size * 2  # Éviter les boucles infinies
-        
-        while progress and iterations < max_iterations:
-            progress = False
-            iterations += 1
-            
-            # Naked Singles (cellules avec un seul candidat)
-            for r, c in self.empty_cells[:]:  # Copie pour modification sécurisée
-                if self.board[r][c] == 0:
-                    candidates = self._get_candidates(r, c)
-                    if len(candidates) == 1:
-                        num = next(iter(candidates))
-                        self.board[r][c] = num
-                        self.empty_cells.remove((r, c))
-                        self._update_constraints(r, c, num)
-                        progress = True
-                    elif len(candidates) == 0:
-                        return False  # Contradiction détectée
-            
-            # Hidden Singles (nombres qui ne peuvent aller qu'à une place)
-            # Par ligne
-            for r in range(self.size):
-                for num in list(self.row_candidates[r]):
-                    possible_cols = [c for c in range(self.size) 
-                                   if self.board[r][c] == 0 and num in self._get_candidates(r, c)]
-                    if len(possible_cols) == 1:
-                        c = possible_cols[0]
-                        self.board[r][c] = num
-                        if (r, c) in self.empty_cells:
-                            self.empty_cells.remove((r, c))
-                        self._update_constraints(r, c, num)
-                        progress = True
-            
-            # Par colonne
-            for c in range(self.size):
-                for num in list(self.col_candidates[c]):
-                    possible_rows = [r for r in range(self.size) 
-                                   if self.board[r][c] == 0 and num in self._get_candidates(r, c)]
-                    if len(possible_rows) == 1:
-                        r = possible_rows[0]
-                        self.board[r][c] = num
-                        if (r, c) in self.empty_cells:
-                            self.empty_cells.remove((r, c))
-                        self._update_constraints(r, c, num)
-                        progress = True
-            
-            # Par bloc
-            for block_r in range(self.block_size):
-                for block_c in range(self.block_size):
-                    for num in list(self.block_candidates[block_r][block_c]):
-                        possible_positions = []
-                        for r in range(block_r * self.block_size, (block_r + 1) * self.block_size):
-                            for c in range(block_c * self.block_size, (block_c + 1) * self.block_size):
-                                if self.board[r][c] == 0 and num in self._get_candidates(r, c):
-                                    possible_positions.append((r, c))
-                        
-                        if len(possible_positions) == 1:
-                            r, c = possible_positions[0]
-                            self.board[r][c] = num
-                            if (r, c) in self.empty_cells:
-                                self.empty_cells.remove((r, c))
-                            self._update_constraints(r, c, num)
-                            progress = True
+        """Singletons nus et cachés, pris dans la file de travail jusqu'à épuisement"""
+        if not self.consistent:
+            self.queue.clear()
+            return False
+        
+        n = self.size
+        board = self.board
+        cand = self.cand
+        counts = self.counts
+        unit_free = self.unit_free
+        queue = self.queue
+        stats = self.stats
+        
+        while queue:
+            item = queue.pop()
+            if len(item) == 1:
+                # Naked Single (case avec un seul candidat)
+                i = item[0]
+                r, c = divmod(i, n)
+                if board[r][c] != 0:
+                    continue
+                candidates = cand[i]
+                if candidates == 0:
+                    queue.clear()
+                    return False  # Contradiction détectée
+                ok = self._place(r, c, candidates.bit_length())
+                if stats is not None:
+                    stats.found("naked_single")
+            else:
+                # Hidden Single (chiffre qui ne peut aller qu'à une place de l'unité)
+                u, d = item
+                bit = 1 << d
+                if not unit_free[u] & bit:
+                    continue  # Déjà placé entre-temps
+                count = counts[u * n + d]
+                if count == 0:
+                    queue.clear()
+                    return False
+                if count != 1:
+                    continue
+                i = next(j for j in self.unit_cells[u] if cand[j] & bit)
+                r, c = divmod(i, n)
+                ok = self._place(r, c, d + 1)
+                if stats is not None:
+                    stats.found(("hidden_single_row", "hidden_single_col", "hidden_single_box")[u // n])
+            if not ok:
+                queue.clear()
+                return False
         
         return True
     
-    def _backtrack_ultra_fast(self) -> bool:
-        """Backtracking ultra-optimisé avec heuristiques avancées"""
+    def _deduce(self) -> bool:
+        """Singletons puis techniques avancées, jusqu'à ce que plus rien ne progresse"""
+        while self._solve_logical_techniques():
+            if not self.empty_cells:
+                return True
+            # ✅ Première technique (la moins chère) qui trouve quelque chose
+            for name, technique in self.techniques:
+                eliminations = technique(self)
+                if eliminations:
+                    break
+            else:
+                return True  # Bloqué : il faudra brancher
+            
+            if self.stats is not None:
+                self.stats.found(name)
+            ok = True
+            for i, bit in eliminations:
+                if self.cand[i] & bit and not self._eliminate(i, bit):
+                    ok = False
+            if not ok:
+                self.queue.clear()
+                return False
+        return False
+    
+    def _backtrack_ultra_fast(self, depth: int = 0, deadline: Optional[float] = None) -> bool:
+        """Backtracking ultra-optimisé avec heuristiques avancées
+
+        Tous les candidats sont explorés : la recherche est complète. Avec
+        ``deadline`` (horodatage ``time.time()``), elle s'interrompt une fois
+        l'échéance passée et ``self.timed_out`` passe à True. Un jeton
+        ``cancel`` annulé lève ``SolveCancelled`` (grille laissée incomplète).
+        """
+        if deadline is not None and time.time() > deadline:
+            self.timed_out = True
+            return False
+        if self.cancel is not None:
+            self.cancel.check()
+        if self.stats is not None:
+            self.stats.enter(depth, self.size * self.size - len(self.empty_cells))
         if not self.empty_cells:
             return True
         
         # MRV + Degree Heuristic : choisir la cellule la plus contrainte
-        def cell_priority(pos):
-            r, c = pos
-            candidates = self._get_candidates(r, c)
-            if not candidates:
-                return (0, 0)  # Contradiction - priorité maximale
-            # Moins de candidats = priorité plus haute, plus de contraintes voisines = priorité plus haute
-            neighbor_constraints = len([1 for nr in range(self.size) if self.board[nr][c] == 0]) + \
-                                 len([1 for nc in range(self.size) if self.board[r][nc] == 0])
-            return (len(candidates), -neighbor_constraints)
-        
-        self.empty_cells.sort(key=cell_priority)
-        r, c = self.empty_cells[0]
-        
+        r, c = self._select_cell()
         candidates = self._get_candidates(r, c)
         if not candidates:
             return False  # Pas de solution possible
         
-        # Sauvegarder l'état pour backtrack
-        old_empty_cells = self.empty_cells[:]
-        old_row_candidates = [s.copy() for s in self.row_candidates]
-        old_col_candidates = [s.copy() for s in self.col_candidates]
-        old_block_candidates = [[s.copy() for s in row] for row in self.block_candidates]
+        # Seule la position dans le journal est mémorisée pour le retour arrière
+        mark = len(self.trail)
         
-        for num in candidates:
-            # Tenter ce nombre
-            self.board[r][c] = num
-            self.empty_cells.remove((r, c))
-            self._update_constraints(r, c, num)
-            
-            # Appliquer les techniques logiques
-            if self._solve_logical_techniques():
-                if self._backtrack_ultra_fast():
+        for num in _iter_digits(candidates):
+            # Tenter ce nombre puis propager ses conséquences
+            if self._place(r, c, num) and self._deduce():
+                if self._backtrack_ultra_fast(depth + 1, deadline):
                     return True
             
-            # Backtrack complet
-            self.board[r][c] = 0
-            self.empty_cells = old_empty_cells[:]
-            self.row_candidates = [s.copy() for s in old_row_candidates]
-            self.col_candidates = [s.copy() for s in old_col_candidates]
-            self.block_candidates = [[s.copy() for s in row] for row in old_block_candidates]
+            if self.stats is not None:
+                self.stats.backtracks += 1
+            # Backtrack : dépiler ce placement et tout ce que la logique en a déduit
+            self.queue.clear()
+            self._undo(mark)
+            if self.timed_out:
+                return False
         
         return False
     
     def solve_with_timeout(self, timeout_seconds=15):
-        """Version avec timeout pour la vérification"""
+        """Version avec timeout pour la vérification
+
+        Returns:
+            bool: True si la grille est résolue ; sinon ``self.timed_out``
+            distingue une recherche interrompue d'une grille sans solution.
+        """
         start_time = time.time()
+        self.timed_out = False
         
-        # Phase 1: Techniques logiques avec timeout
-        if not self._solve_logical_techniques():
+        # Phase 1: Techniques logiques
+        if not self._deduce():
             return False
         
-        # Phase 2: Backtracking rapide avec timeout
-        return self._backtrack_with_timeout(start_time, timeout_seconds)
+        # Phase 2: Backtracking complet, borné dans le temps
+        logic_done = time.time()
+        result = self._backtrack_ultra_fast(deadline=start_time + timeout_seconds)
+        if self.stats is not None:
+            self.stats.add_time("logic", logic_done - start_time)
+            self.stats.add_time("search", time.time() - logic_done)
+            self.stats.solved = result
+        return result
     
-    def _backtrack_with_timeout(self, start_time, timeout_seconds):
-        """Backtracking avec timeout"""
-        if time.time() - start_time > timeout_seconds:
-            return False  # Timeout atteint
-            
-        if not self.empty_cells:
-            return True
-        
-        # MRV simplifié pour plus de vitesse
-        r, c = min(self.empty_cells, key=lambda pos: len(self._get_candidates(pos[0], pos[1])))
-        candidates = self._get_candidates(r, c)
-        
-        if not candidates:
-            return False
-        
-        self.empty_cells.remove((r, c))
-        
-        for num in list(candidates)[:3]:  # ✅ Limiter à 3 candidats max pour vitesse
-            self.board[r][c] = num
-            self._update_constraints(r, c, num)
-            
-            if self._backtrack_with_timeout(start_time, timeout_seconds):
-                return True
-            
-            # Backtrack rapide
-            self.board[r][c] = 0
-            self._update_constraints(r, c, num, remove=False)
-        
-        self.empty_cells.append((r, c))
-        return False
+    def verify(self, timeout_seconds=15) -> str:
+        """Vérification à trois issues : VERIFY_SOLVED, VERIFY_UNSOLVABLE ou VERIFY_TIMEOUT"""
+        if self.solve_with_timeout(timeout_seconds):
+            return VERIFY_SOLVED
+        return VERIFY_TIMEOUT if self.timed_out else VERIFY_UNSOLVABLE
     
     def solve(self) -> bool:
         """Résolution complète ultra-optimisée"""
         start_time = time.time()
         
         # Phase 1: Techniques logiques pures
-        if not self._solve_logical_techniques():
+        if not self._deduce():
             logger.info("❌ Contradiction détectée - pas de solution")
             return False
+        logic_done = time.time()
         
         # Phase 2: Backtracking si nécessaire
         result = self._backtrack_ultra_fast()
         
         end_time = time.time()
+        if self.stats is not None:
+            self.stats.add_time("logic", logic_done - start_time)
+            self.stats.add_time("search", end_time - logic_done)
+            self.stats.solved = result
         logger.info(f"🚀 Résolution {self.size}x{self.size} en {end_time - start_time:.2f}s")
         return result
 
+class DancingLinksSolver:
+    """Solveur exact-cover (Algorithm X de Knuth, Dancing Links) pour 4x4 à 25x25
+
+    Chaque case, couple (ligne, chiffre), (colonne, chiffre) et (bloc, chiffre)
+    est une contrainte ; chaque candidat (r, c, num) couvre exactement quatre
+    contraintes. Les contraintes déjà satisfaites par les indices ne sont pas
+    créées, la matrice ne contient donc que les candidats réellement possibles.
+    """
+
+    def __init__(self, board: List[List[int]], stats: Optional[SolveStats] = None,
+                 cancel: Optional[CancelToken] = None):
+        self.size = len(board)
+        self.block_size = int(self.size ** 0.5)
+        self.board = board  # ✅ RÉFÉRENCE DIRECTE
+        self.stats = stats
+        self.cancel = cancel
+        self.solution = []  # Candidats (r, c, num) de la première solution trouvée
+        self.consistent = True
+        build_start = time.time()
+        self._build()
+        if stats is not None:
+            stats.add_time("build", time.time() - build_start)
+
+    def _build(self):
+        """Construit la matrice creuse en listes parallèles (plus rapide que des objets)"""
+        n = self.size
+        bs = self.block_size
+        nn = n * n
+        full_mask = (1 << n) - 1
+        row_used = [0] * n
+        col_used = [0] * n
+        box_used = [0] * n
+        empty_cells = []
+
+        for r in range(n):
+            for c in range(n):
+                val = self.board[r][c]
+                if val == 0:
+                    empty_cells.append((r, c))
+                    continue
+                bit = 1 << (val - 1)
+                box = (r // bs) * bs + c // bs
+                if (row_used[r] | col_used[c] | box_used[box]) & bit:
+                    self.consistent = False  # Indices contradictoires
+                row_used[r] |= bit
+                col_used[c] |= bit
+                box_used[box] |= bit
+
+        # Colonnes actives : uniquement les contraintes non satisfaites
+        column_ids = {}
+        for r, c in empty_cells:
+            column_ids[r * n + c] = None
+        for unit, used in enumerate(row_used):
+            for num in _iter_digits(full_mask & ~used):
+                column_ids[nn + unit * n + num - 1] = None
+        for unit, used in enumerate(col_used):
+            for num in _iter_digits(full_mask & ~used):
+                column_ids[2 * nn + unit * n + num - 1] = None
+        for unit, used in enumerate(box_used):
+            for num in _iter_digits(full_mask & ~used):
+                column_ids[3 * nn + unit * n + num - 1] = None
+
+        # Noeud 0 = racine, noeuds 1..m = en-têtes de colonnes
+        m = len(column_ids)
+        for index, key in enumerate(sorted(column_ids), start=1):
+            column_ids[key] = index
+        self.L = [i - 1 for i in range(m + 1)]
+        self.R = [i + 1 for i in range(m + 1)]
+        self.L[0] = m
+        self.R[m] = 0
+        self.U = list(range(m + 1))
+        self.D = list(range(m + 1))
+        self.C = list(range(m + 1))
+        self.S = [0] * (m + 1)
+        self.row_of = [None] * (m + 1)
+        self.givens = nn - len(empty_cells)
+
+        for r, c in empty_cells:
+            box = (r // bs) * bs + c // bs
+            candidates = full_mask & ~(row_used[r] | col_used[c] | box_used[box])
+            for num in _iter_digits(candidates):
+                d = num - 1
+                self._add_row((r, c, num), (
+                    column_ids[r * n + c],
+                    column_ids[nn + r * n + d],
+                    column_ids[2 * nn + c * n + d],
+                    column_ids[3 * nn + box * n + d],
+                ))
+
+    def _add_row(self, candidate, columns):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        first = len(L)
+        for offset, col in enumerate(columns):
+            node = first + offset
+            L.append(node - 1 if offset else first + len(columns) - 1)
+            R.append(node + 1 if offset < len(columns) - 1 else first)
+            U.append(U[col])
+            D.append(col)
+            C.append(col)
+            D[U[col]] = node
+            U[col] = node
+            S[col] += 1
+            self.row_of.append(candidate)
+
+    def _cover(self, col):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[col]] = R[col]
+        L[R[col]] = L[col]
+        i = D[col]
+        while i != col:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, col):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[col]
+        while i != col:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[col]] = col
+        L[R[col]] = col
+
+    def _select(self, node):
+        """Couvre les autres colonnes de la ligne choisie"""
+        j = self.R[node]
+        while j != node:
+            self._cover(self.C[j])
+            j = self.R[j]
+
+    def _unselect(self, node):
+        j = self.L[node]
+        while j != node:
+            self._uncover(self.C[j])
+            j = self.L[j]
+
+    def _choose_column(self):
+        """Heuristique S de Knuth : la contrainte avec le moins de candidats"""
+        R, S = self.R, self.S
+        best, best_size = 0, None
+        col = R[0]
+        while col != 0:
+            size = S[col]
+            if best_size is None or size < best_size:
+                best, best_size = col, size
+                if size <= 1:
+                    break
+            col = R[col]
+        return best
+
+    def _search(self, limit: int) -> int:
+        """Algorithm X itératif ; s'arrête après ``limit`` solutions"""
+        if not self.consistent:
+            return 0
+
+        count = 0
+        stats = self.stats
+        cancel = self.cancel
+        chosen = []  # Pile des noeuds choisis (un par niveau)
+        while True:
+            if cancel is not None:
+                cancel.check()  # La matrice reste couverte : le solveur est abandonné
+            if self.R[0] == 0:
+                # Toutes les contraintes sont couvertes : solution trouvée
+                count += 1
+                if count == 1:
+                    self.solution = [self.row_of[node] for node in chosen]
+                if count >= limit:
+                    break
+                advanced = False
+            else:
+                col = self._choose_column()
+                if self.S[col] > 0:
+                    self._cover(col)
+                    node = self.D[col]
+                    chosen.append(node)
+                    self._select(node)
+                    if stats is not None:
+                        stats.enter(len(chosen), self.givens + len(chosen))
+                    continue
+                advanced = False
+
+            # Retour arrière : passer au candidat suivant du niveau le plus profond
+            while chosen and not advanced:
+                node = chosen.pop()
+                self._unselect(node)
+                if stats is not None:
+                    stats.backtracks += 1
+                col = self.C[node]
+                node = self.D[node]
+                if node != col:
+                    chosen.append(node)
+                    self._select(node)
+                    advanced = True
+                    if stats is not None:
+                        stats.enter(len(chosen), self.givens + len(chosen))
+                else:
+                    self._uncover(col)
+            if not advanced:
+                return count
+
+        # Limite atteinte : restaurer la matrice pour un éventuel nouvel appel
+        while chosen:
+            node = chosen.pop()
+            self._unselect(node)
+            self._uncover(self.C[node])
+        return count
+
+    def count_solutions(self, limit: int = 2) -> int:
+        """Compte les solutions jusqu'à ``limit`` (la première est mémorisée)"""
+        return self._search(limit)
+
+    def solve(self) -> bool:
+        """Résout la grille en place ; retourne False si elle n'a pas de solution"""
+        start_time = time.time()
+        found = self._search(1) > 0
+        if found:
+            for r, c, num in self.solution:
+                self.board[r][c] = num
+        end_time = time.time()
+        if self.stats is not None:
+            self.stats.add_time("search", end_time - start_time)
+            self.stats.solved = found
+        logger.info(f"🚀 Résolution {self.size}x{self.size} en {end_time - start_time:.2f}s")
+        return found
+
 def solve_sudoku_classic_fast_check(board):
     """Vérification rapide pour petites grilles (version allégée)"""
     size = len(board)
@@ -390,7 +1172,7 @@ def solve_sudoku_classic_fast_check(board):
     
     return solve_fast()
 
-def solve_sudoku_classic_optimized(board):
+def solve_sudoku_classic_optimized(board, stats=None, cancel=None):
     """Version classique ultra-optimisée pour petites grilles"""
     size = len(board)
     block = int(size ** 0.5)
@@ -417,7 +1199,11 @@ def solve_sudoku_classic_optimized(board):
         used = row_sets[r] | col_sets[c] | block_sets[r // block][c // block]
         return [n for n in range(1, size + 1) if n not in used]
     
-    def solve():
+    def solve(depth=0):
+        if cancel is not None:
+            cancel.check()
+        if stats is not None:
+            stats.enter(depth, size * size - len(empty_cells))
         if not empty_cells:
             return True
         
@@ -437,9 +1223,11 @@ def solve_sudoku_classic_optimized(board):
             col_sets[c].add(num)
             block_sets[r // block][c // block].add(num)
             
-            if solve():
+            if solve(depth + 1):
                 return True
             
+            if stats is not None:
+                stats.backtracks += 1
             # Backtrack
             board[r][c] = 0
             row_sets[r].remove(num)
@@ -452,30 +1240,139 @@ def solve_sudoku_classic_optimized(board):
     start_time = time.time()
     result = solve()
     end_time = time.time()
+    if stats is not None:
+        stats.add_time("search", end_time - start_time)
+        stats.solved = result
     logger.info(f"🚀 Résolution {size}x{size} en {end_time - start_time:.2f}s")
     return result
 
+# ===== REGISTRE DES SOLVEURS =====
+# Chaque backend résout la grille EN PLACE et retourne True/False ;
+# il remplit l'objet SolveStats optionnel qu'on lui passe et lève
+# SolveCancelled si son CancelToken optionnel est annulé.
+SOLVER_BACKENDS = {}
+DEFAULT_BACKEND = "dlx"
+
+# ✅ Backend par taille, d'après ``python -m app.benchmark run`` : DLX garde la
+# meilleure queue de latence en 9x9 (grilles connues difficiles), Ultra est
+# devant en 16x16 et le seul à tenir les 25x25 peu remplies
+BACKEND_BY_SIZE = {
+    4: "dlx",
+    9: "dlx",
+    16: "ultra",
+    25: "ultra",
+}
+
+def register_solver(name):
+    """Décorateur : enregistre un backend de résolution sous ``name``"""
+    def decorator(func):
+        SOLVER_BACKENDS[name] = func
+        return func
+    return decorator
+
+@register_solver("classic")
+def _solve_with_classic(board, stats=None, cancel=None):
+    return solve_sudoku_classic_optimized(board, stats, cancel)
+
+@register_solver("ultra")
+def _solve_with_ultra(board, stats=None, cancel=None):
+    return UltraSudokuSolver(board, stats, cancel=cancel).solve()
+
+@register_solver("dlx")
+def _solve_with_dlx(board, stats=None, cancel=None):
+    return DancingLinksSolver(board, stats, cancel).solve()
+
+def select_backend(size):
+    """Backend utilisé par défaut pour une taille de grille"""
+    return BACKEND_BY_SIZE.get(size, DEFAULT_BACKEND)
+
+def count_solutions(board, limit=2):
+    """Compte les solutions d'une grille (sans la modifier), au plus ``limit``"""
+    return DancingLinksSolver(board).count_solutions(limit)
+
 # ✅ Interface principale - PLUS DE MULTIPROCESSING
-def solve_sudoku(board):
-    """Solveur principal avec sélection automatique intelligente"""
+def solve_sudoku(board, backend=None, stats=None, cancel=None):
+    """Solveur principal avec sélection du backend via le registre
+
+    Passer un ``SolveStats`` pour collecter les compteurs de recherche, et un
+    ``CancelToken`` pour pouvoir interrompre la résolution (``SolveCancelled``).
+    """
     size = len(board)
     empty_count = sum(row.count(0) for row in board)
+    name = backend or select_backend(size)
+    if name not in SOLVER_BACKENDS:
+        raise ValueError(f"Backend de résolution inconnu : {name}")
     
     # Log minimal et propre
-    logger.info(f"🧩 Résolution {size}x{size} ({empty_count} cases)")
-    
-    # Sélection du solveur selon la taille
-    if size <= 9:
-        # Petites grilles : algorithme classique optimisé
-        return solve_sudoku_classic_optimized(board)
-    else:
-        # Grandes grilles : solveur ultra-avancé
-        solver = UltraSudokuSolver(board)
-        return solver.solve()
+    logger.info(f"🧩 Résolution {size}x{size} ({empty_count} cases, {name})")
+    if stats is not None:
+        stats.backend = name
+    return SOLVER_BACKENDS[name](board, stats, cancel)
+
+def solve_sudoku_with_stats(board, backend=None):
+    """Résout la grille en place et retourne un ``SolveStats`` (``.solved`` = résultat)"""
+    stats = SolveStats()
+    stats.solved = bool(solve_sudoku(board, backend, stats))
+    return stats
+
+def validate_solution(user_grid, original_grid):
+    """Vérifie une grille joueur par contraintes, sans solveur
+
+    Contrôle en une seule passe (masques de bits) que les indices sont
+    conservés et que chaque ligne, colonne et bloc est une permutation de
+    1..n. Toute solution valide est acceptée, même si la grille n'est pas unique.
+
+    Returns:
+        tuple: (correcte, liste triée des cases [r, c] en conflit)
+    """
+    size = len(original_grid)
+    block = int(size ** 0.5)
+    # Grille mal formée (lignes manquantes ou qui ne sont pas des listes) : refusée sans exception
+    if not isinstance(user_grid, list) or len(user_grid) != size or \
+            any(not isinstance(row, list) or len(row) != size for row in user_grid):
+        return False, []
+
+    # Première case (r, c) vue pour chaque (unité, chiffre), ou None
+    row_seen = [[None] * (size + 1) for _ in range(size)]
+    col_seen = [[None] * (size + 1) for _ in range(size)]
+    box_seen = [[None] * (size + 1) for _ in range(size)]
+    row_masks = [0] * size
+    col_masks = [0] * size
+    box_masks = [0] * size
+    conflicts = set()
+    complete = True
+
+    for r in range(size):
+        user_row = user_grid[r]
+        given_row = original_grid[r]
+        for c in range(size):
+            val = user_row[c]
+            given = given_row[c]
+            if not isinstance(val, int) or val < 1 or val > size:
+                complete = False
+                if given:
+                    conflicts.add((r, c))  # Indice effacé
+                continue
+            if given and val != given:
+                conflicts.add((r, c))  # Indice modifié
+
+            bit = 1 << (val - 1)
+            b = (r // block) * block + c // block
+            for masks, seen, unit in ((row_masks, row_seen, r),
+                                      (col_masks, col_seen, c),
+                                      (box_masks, box_seen, b)):
+                if masks[unit] & bit:
+                    conflicts.add(seen[unit][val])
+                    conflicts.add((r, c))
+                else:
+                    masks[unit] |= bit
+                    seen[unit][val] = (r, c)
+
+    return complete and not conflicts, [list(cell) for cell in sorted(conflicts)]
 
 def check_solution(user_grid, original_grid):
-    solved_grid = copy.deepcopy(original_grid)
-    return solve_sudoku(solved_grid) and user_grid == solved_grid
+    """Vrai si la grille du joueur est une solution valide de la grille d'origine"""
+    return validate_solution(user_grid, original_grid)[0]
 
 def to_symbol(n):
-    return str(n) if n <= 9 else chr(ord('A') + n - 10)
\ No newline at end of file
+    return str(n) if n <= 9 else chr(ord('A') + n - 10)
@@ -0,0 +1,277 @@
+# ===== TECHNIQUES DE DÉDUCTION AVANCÉES =====
+# Appliquées par UltraSudokuSolver quand les singletons ne suffisent plus,
+# avant de brancher, et réutilisables pour noter la difficulté d'une grille.
+#
+# Chaque technique reçoit l'état persistant d'un solveur :
+#   size        : taille de la grille (n)
+#   cand        : masque de candidats par case (index r * n + c, 0 si remplie)
+#   unit_cells  : cases de chaque unité (lignes 0..n-1, colonnes n..2n-1, blocs 2n..3n-1)
+#   units_of    : (ligne, colonne, bloc) de chaque case
+#   unit_free   : chiffres pas encore placés dans chaque unité
+#   counts      : cases possibles par (unité, chiffre), index unité * n + chiffre - 1
+#   digit_cells : pour chaque chiffre (index d), masque des cases (bit r * n + c) où il reste candidat
+# et retourne la liste des éliminations trouvées : [(case, bit), ...].
+#
+# Chaque technique porte aussi une note de difficulté « humaine » (échelle
+# proche de Sudoku Explainer) : le correcteur de grilles résout pas à pas
+# avec la technique la plus simple disponible et retient la plus difficile.
+
+from itertools import combinations
+
+TECHNIQUES = {}
+
+# Notes de difficulté ; les singletons sont traités à part (ils placent un chiffre)
+RATINGS = {
+    "hidden_single_box": 1.2,
+    "hidden_single_row": 1.5,
+    "hidden_single_col": 1.5,
+    "naked_single": 2.3,
+}
+GUESS_RATING = 5.0  # Aucune technique ne suffit : il faut faire une hypothèse
+
+
+def register_technique(name, cost, rating):
+    """Décorateur : enregistre une technique, son coût (les moins chères d'abord) et sa note"""
+    def decorator(func):
+        TECHNIQUES[name] = (cost, func)
+        RATINGS[name] = rating
+        return func
+    return decorator
+
+
+def ordered_techniques(names=None):
+    """Liste [(nom, fonction)] triée par coût croissant"""
+    selected = TECHNIQUES if names is None else {name: TECHNIQUES[name] for name in names}
+    return [(name, func) for name, (cost, func) in sorted(selected.items(), key=lambda item: item[1][0])]
+
+
+def graded_techniques():
+    """Liste [(nom, note, fonction, place)] triée par note croissante
+
+    ``place`` vaut True pour les singletons, qui retournent des placements
+    [(case, chiffre), ...] au lieu d'éliminations.
+    """
+    ranked = [("hidden_single_box", hidden_singles_box, True),
+              ("hidden_single_row", hidden_singles_row, True),
+              ("hidden_single_col", hidden_singles_col, True),
+              ("naked_single", naked_singles, True)]
+    ranked += [(name, func, False) for name, (cost, func) in TECHNIQUES.items()]
+    return sorted(((name, RATINGS[name], func, place) for name, func, place in ranked),
+                  key=lambda item: item[1])
+
+
+_LAYOUT_CACHE = {}
+
+
+def _layout(n):
+    """Masque (un bit par case) de chaque unité et lignes/colonnes qui croisent chaque bloc"""
+    if n not in _LAYOUT_CACHE:
+        block_size = int(n ** 0.5)
+        unit_masks = [0] * (3 * n)
+        box_lines = {}
+        for i in range(n * n):
+            r, c = divmod(i, n)
+            box = 2 * n + (r // block_size) * block_size + c // block_size
+            for unit in (r, n + c, box):
+                unit_masks[unit] |= 1 << i
+            box_lines.setdefault(box, set()).update((r, n + c))
+        _LAYOUT_CACHE[n] = (unit_masks, {box: sorted(lines) for box, lines in box_lines.items()})
+    return _LAYOUT_CACHE[n]
+
+
+def _hidden_singles(state, first_unit):
+    """Chiffres qui n'ont plus qu'une place dans une unité (lignes, colonnes ou blocs)"""
+    n = state.size
+    unit_masks, _ = _layout(n)
+    placements = {}
+    for unit in range(first_unit, first_unit + n):
+        free = state.unit_free[unit]
+        for d in range(n):
+            if free >> d & 1 and state.counts[unit * n + d] == 1:
+                cell = (state.digit_cells[d] & unit_masks[unit]).bit_length() - 1
+                placements.setdefault(cell, d + 1)
+    return list(placements.items())
+
+
+def hidden_singles_box(state):
+    return _hidden_singles(state, 2 * state.size)
+
+
+def hidden_singles_row(state):
+    return _hidden_singles(state, 0)
+
+
+def hidden_singles_col(state):
+    return _hidden_singles(state, state.size)
+
+
+def naked_singles(state):
+    """Cases vides qui n'ont plus qu'un candidat"""
+    return [(i, mask.bit_length()) for i, mask in enumerate(state.cand) if mask and mask & (mask - 1) == 0]
+
+
+@register_technique("locked_candidates", 1, 2.6)
+def locked_candidates(state):
+    """Candidats verrouillés : pointage (bloc -> ligne/colonne) et réduction ligne/colonne -> bloc"""
+    n = state.size
+    unit_masks, box_lines = _layout(n)
+    eliminations = []
+    for d, board in enumerate(state.digit_cells):
+        if not board:
+            continue
+        bit = 1 << d
+        for box in range(2 * n, 3 * n):
+            in_box = board & unit_masks[box]
+            if not in_box:
+                continue
+            for line in box_lines[box]:
+                shared = in_box & unit_masks[line]
+                if not shared:
+                    continue
+                if shared == in_box:
+                    # Pointage : dans ce bloc, le chiffre est confiné à cette ligne/colonne
+                    removed = board & unit_masks[line] & ~unit_masks[box]
+                elif shared == board & unit_masks[line]:
+                    # Réduction : sur cette ligne/colonne, le chiffre est confiné au bloc
+                    removed = in_box & ~unit_masks[line]
+                else:
+                    continue
+                while removed:
+                    low = removed & -removed
+                    eliminations.append((low.bit_length() - 1, bit))
+                    removed ^= low
+    return eliminations
+
+
+def _naked_subsets(state, k):
+    """k cases d'une unité dont les candidats réunis forment exactement k chiffres"""
+    cand = state.cand
+    eliminations = []
+    for unit in range(3 * state.size):
+        cells = state.unit_cells[unit]
+        small = [i for i in cells if cand[i] and cand[i].bit_count() <= k]
+        if len(small) < k:
+            continue
+        for group in combinations(small, k):
+            union = 0
+            for i in group:
+                union |= cand[i]
+            if union.bit_count() != k:
+                continue
+            for j in cells:
+                if j not in group and cand[j] & union:
+                    mask = cand[j] & union
+                    while mask:
+                        low = mask & -mask
+                        eliminations.append((j, low))
+                        mask ^= low
+    return eliminations
+
+
+def _hidden_subsets(state, k):
+    """k chiffres d'une unité confinés dans exactement k cases"""
+    n = state.size
+    cand = state.cand
+    counts = state.counts
+    unit_masks, _ = _layout(n)
+    boards = state.digit_cells
+    eliminations = []
+    for unit in range(3 * n):
+        free = state.unit_free[unit]
+        digits = [d for d in range(n) if free >> d & 1 and 2 <= counts[unit * n + d] <= k]
+        if len(digits) < k:
+            continue
+        for group in combinations(digits, k):
+            cells = 0
+            keep = 0
+            for d in group:
+                cells |= boards[d] & unit_masks[unit]
+                keep |= 1 << d
+            if cells.bit_count() != k:
+                continue
+            while cells:
+                low = cells & -cells
+                i = low.bit_length() - 1
+                mask = cand[i] & ~keep
+                while mask:
+                    bit = mask & -mask
+                    eliminations.append((i, bit))
+                    mask ^= bit
+                cells ^= low
+    return eliminations
+
+
+def _fish(state, k):
+    """Poisson d'ordre k (X-Wing, Swordfish) sur les lignes puis sur les colonnes"""
+    n = state.size
+    counts = state.counts
+    unit_masks, _ = _layout(n)
+    boards = state.digit_cells
+    eliminations = []
+    for base, cover in ((0, n), (n, 0)):
+        for d, board in enumerate(boards):
+            bit = 1 << d
+            # Lignes (ou colonnes) où le chiffre n'a que 2..k places : masque des colonnes (ou lignes)
+            lines = []
+            for line in range(n):
+                if not state.unit_free[base + line] & bit or \
+                        not 2 <= counts[(base + line) * n + d] <= k:
+                    continue
+                cells = board & unit_masks[base + line]
+                positions = 0
+                while cells:
+                    low = cells & -cells
+                    r, c = divmod(low.bit_length() - 1, n)
+                    positions |= 1 << (c if base == 0 else r)
+                    cells ^= low
+                lines.append((line, positions))
+            if len(lines) < k:
+                continue
+            for group in combinations(lines, k):
+                covered = 0
+                fish = 0
+                for line, positions in group:
+                    covered |= positions
+                    fish |= unit_masks[base + line]
+                if covered.bit_count() != k:
+                    continue
+                removed = 0
+                for p in range(n):
+                    if covered >> p & 1:
+                        removed |= board & unit_masks[cover + p]
+                removed &= ~fish
+                while removed:
+                    low = removed & -removed
+                    eliminations.append((low.bit_length() - 1, bit))
+                    removed ^= low
+    return eliminations
+
+
+@register_technique("naked_pair", 2, 3.0)
+def naked_pair(state):
+    return _naked_subsets(state, 2)
+
+
+@register_technique("hidden_pair", 3, 3.4)
+def hidden_pair(state):
+    return _hidden_subsets(state, 2)
+
+
+@register_technique("x_wing", 4, 3.2)
+def x_wing(state):
+    return _fish(state, 2)
+
+
+@register_technique("naked_triple", 5, 3.6)
+def naked_triple(state):
+    return _naked_subsets(state, 3)
+
+
+@register_technique("hidden_triple", 6, 4.0)
+def hidden_triple(state):
+    return _hidden_subsets(state, 3)
+
+
+@register_technique("swordfish", 7, 3.8)
+def swordfish(state):
+    return _fish(state, 3)
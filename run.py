@@ -1,5 +1,5 @@
 from app import app
-from app.routes import executor
+from app.routes import executor, solve_service, warm_puzzle_pool
 import atexit
 import logging
 import os
@@ -24,10 +24,15 @@ def setup_clean_logging():
 def shutdown_executor():
     print("🛑 Arrêt du serveur Sudoku")
     executor.shutdown(wait=False)
+    solve_service.shutdown()
 
 # Configuration au démarrage
-setup_clean_logging()
-atexit.register(shutdown_executor)
+# ✅ Les processus du pool de résolution (forkserver/spawn) réimportent ce
+# module sous le nom __mp_main__ : pas de logging, d'arrêt ni de préchauffage chez eux
+if __name__ != "__mp_main__":
+    setup_clean_logging()
+    atexit.register(shutdown_executor)
+    warm_puzzle_pool()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,44 @@
+# Grilles de référence partagées par les tests
+
+# Grille 9x9 réputée très difficile (A. Inkala) et sa solution unique
+HARD_9 = [
+    [8, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 3, 6, 0, 0, 0, 0, 0],
+    [0, 7, 0, 0, 9, 0, 2, 0, 0],
+    [0, 5, 0, 0, 0, 7, 0, 0, 0],
+    [0, 0, 0, 0, 4, 5, 7, 0, 0],
+    [0, 0, 0, 1, 0, 0, 0, 3, 0],
+    [0, 0, 1, 0, 0, 0, 0, 6, 8],
+    [0, 0, 8, 5, 0, 0, 0, 1, 0],
+    [0, 9, 0, 0, 0, 0, 4, 0, 0],
+]
+HARD_9_SOLUTION = [
+    [8, 1, 2, 7, 5, 3, 6, 4, 9],
+    [9, 4, 3, 6, 8, 2, 1, 7, 5],
+    [6, 7, 5, 4, 9, 1, 2, 8, 3],
+    [1, 5, 4, 2, 3, 7, 8, 9, 6],
+    [3, 6, 9, 8, 4, 5, 7, 2, 1],
+    [2, 8, 7, 1, 6, 9, 5, 3, 4],
+    [5, 2, 1, 9, 7, 4, 3, 6, 8],
+    [4, 3, 8, 5, 2, 6, 9, 1, 7],
+    [7, 9, 6, 3, 1, 8, 4, 5, 2],
+]
+
+# Grille 4x4 complète ; en vidant (0,0), (0,1), (2,0), (2,1), les paires
+# 1-2 / 2-1 peuvent s'échanger : exactement deux solutions
+SOLVED_4 = [
+    [1, 2, 3, 4],
+    [3, 4, 1, 2],
+    [2, 1, 4, 3],
+    [4, 3, 2, 1],
+]
+TWO_SOLUTIONS_4 = [
+    [0, 0, 3, 4],
+    [3, 4, 1, 2],
+    [0, 0, 4, 3],
+    [4, 3, 2, 1],
+]
+
+
+def copy_grid(grid):
+    return [row[:] for row in grid]
@@ -0,0 +1,75 @@
+import pytest
+
+from app.sudoku import (
+    DIFFICULTY_LEVELS, GRADE_BANDS, band_distance, count_solutions,
+    difficulty_for_score, generate_puzzle, grade_puzzle,
+)
+from app.techniques import GUESS_RATING, RATINGS
+from grids import HARD_9, HARD_9_SOLUTION, copy_grid
+
+
+def test_singles_only_grid_is_easy():
+    grid = copy_grid(HARD_9_SOLUTION)
+    for r in range(9):
+        grid[r][(r * 4) % 9] = 0  # Une case vide par ligne, colonne et bloc
+    grade = grade_puzzle(grid)
+    assert grade["logical"]
+    assert grade["score"] <= GRADE_BANDS["easy"][1]
+
+
+def test_grid_needing_a_guess():
+    grade = grade_puzzle(HARD_9)
+    assert grade == {"score": GUESS_RATING, "hardest": "guess", "steps": grade["steps"], "logical": False}
+
+
+def test_grading_leaves_grid_untouched():
+    grid = copy_grid(HARD_9)
+    grade_puzzle(grid)
+    assert grid == HARD_9
+
+
+def test_each_rating_falls_inside_one_band():
+    # Aucune note de technique sur une borne : bandes à mi-chemin entre deux notes
+    bounds = {bound for band in GRADE_BANDS.values() for bound in band} - {0.0, GUESS_RATING}
+    assert not bounds & set(RATINGS.values())
+    for rating in list(RATINGS.values()) + [GUESS_RATING]:
+        assert sum(band_distance(rating, band) == 0 for band in GRADE_BANDS.values()) == 1
+
+
+@pytest.mark.parametrize("technique, level", [
+    ("hidden_single_box", "easy"),
+    ("hidden_single_col", "easy"),
+    ("naked_single", "medium"),
+    ("locked_candidates", "hard"),
+    ("naked_pair", "hard"),
+    ("x_wing", "expert"),
+    ("hidden_triple", "expert"),
+])
+def test_technique_bands(technique, level):
+    assert difficulty_for_score(RATINGS[technique], 9) == level
+
+
+def test_guess_is_extreme():
+    assert difficulty_for_score(GUESS_RATING, 9) == "extreme"
+
+
+def test_score_above_offered_levels_gets_highest_level():
+    assert difficulty_for_score(RATINGS["x_wing"], 16) == "hard"
+    assert difficulty_for_score(RATINGS["naked_pair"], 25) == "medium"
+
+
+def test_band_distance():
+    assert band_distance(2.6, GRADE_BANDS["hard"]) == 0
+    assert band_distance(GRADE_BANDS["medium"][1], GRADE_BANDS["medium"]) == 0
+    assert band_distance(1.5, GRADE_BANDS["hard"]) == pytest.approx(0.95)
+    assert band_distance(5.0, GRADE_BANDS["hard"]) == pytest.approx(1.9)
+
+
+@pytest.mark.parametrize("difficulty", ["easy", "medium", "hard"])
+def test_generated_puzzle_matches_its_label(difficulty):
+    puzzle = generate_puzzle(difficulty, 9, unique=True)
+    assert puzzle.difficulty in DIFFICULTY_LEVELS[9]
+    # Niveau demandé ou, à défaut, celui de la note réellement obtenue
+    assert band_distance(puzzle.grade["score"], GRADE_BANDS[puzzle.difficulty]) == 0
+    assert grade_puzzle(puzzle.grid) == puzzle.grade
+    assert count_solutions(puzzle.grid, 2) == 1
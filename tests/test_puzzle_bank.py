@@ -0,0 +1,88 @@
+import pytest
+
+from app.puzzle_bank import (
+    decode_givens, decode_puzzle, encode_givens, encode_puzzle,
+    open_bank, record_size, write_bank,
+)
+from app.sudoku import Puzzle, _random_solution
+
+
+def make_puzzle(size, difficulty="easy"):
+    solution = _random_solution(size)
+    # Un indice sur trois, de façon déterministe
+    grid = [[v if (r * size + c) % 3 == 0 else 0 for c, v in enumerate(row)]
+            for r, row in enumerate(solution)]
+    return Puzzle(grid, solution, difficulty, size)
+
+
+@pytest.mark.parametrize("size", [4, 9, 16, 25])
+def test_record_round_trip(size):
+    puzzle = make_puzzle(size, "medium")
+    record = encode_puzzle(puzzle)
+    assert len(record) == record_size(size)
+    decoded = decode_puzzle(record, size, "medium")
+    assert decoded.grid == puzzle.grid
+    assert decoded.solution == puzzle.solution
+    assert (decoded.size, decoded.difficulty) == (size, "medium")
+
+
+@pytest.mark.parametrize("size", [4, 9, 16, 25])
+def test_givens_round_trip(size):
+    grid = make_puzzle(size).grid
+    assert decode_givens(encode_givens(grid), size) == grid
+
+
+def test_givens_carry_no_solution():
+    puzzle = make_puzzle(9)
+    empty = [[0] * 9 for _ in range(9)]
+    assert len(encode_givens(empty)) == len(encode_givens(puzzle.grid)) - (27 * 4 + 7) // 8
+    assert decode_givens(encode_givens(empty), 9) == empty
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda data: data[:-1],               # Tronqué
+    lambda data: data + b"\x00",          # Trop long
+    lambda data: b"\xff" * 11 + data[11:],  # Masque hors grille / incohérent
+])
+def test_malformed_givens_raise(tamper):
+    data = encode_givens(make_puzzle(9).grid)
+    with pytest.raises(ValueError):
+        decode_givens(tamper(data), 9)
+
+
+def test_digit_out_of_range_raises():
+    # 4x4 : chiffres sur 4 bits, un quartet à 0xF vaut 16 > 4
+    grid = [[1, 0, 0, 0]] + [[0] * 4 for _ in range(3)]
+    data = bytearray(encode_givens(grid))
+    data[-1] |= 0x0F
+    with pytest.raises(ValueError):
+        decode_givens(bytes(data), 4)
+
+
+def test_bank_file_round_trip(tmp_path):
+    path = str(tmp_path / "bank.bin")
+    puzzles = {(9, "easy"): [make_puzzle(9) for _ in range(3)],
+               (16, "hard"): [make_puzzle(16, "hard")]}
+    write_bank(path, {key: [encode_puzzle(p) for p in items] for key, items in puzzles.items()})
+
+    bank = open_bank(path)
+    try:
+        assert bank.count(9, "easy") == 3
+        assert bank.count(16, "hard") == 1
+        assert bank.count(9, "hard") == 0
+        assert bank.random_puzzle("hard", 9) is None
+        for (size, difficulty), items in puzzles.items():
+            for i, puzzle in enumerate(items):
+                decoded = decode_puzzle(bank.record(size, difficulty, i), size, difficulty)
+                assert (decoded.grid, decoded.solution) == (puzzle.grid, puzzle.solution)
+        with pytest.raises(IndexError):
+            bank.record(9, "easy", 3)
+    finally:
+        bank.close()
+
+
+def test_missing_or_invalid_bank(tmp_path):
+    assert open_bank(str(tmp_path / "absent.bin")) is None
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"not a bank at all")
+    assert open_bank(str(bad)) is None
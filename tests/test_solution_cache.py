@@ -0,0 +1,58 @@
+import random
+
+from app.solution_cache import SolutionCache, canonical_form
+from app.sudoku import Puzzle, transform_puzzle, validate_solution
+from grids import HARD_9, HARD_9_SOLUTION, SOLVED_4, TWO_SOLUTIONS_4
+
+HARD = Puzzle(HARD_9, HARD_9_SOLUTION, "extreme", 9)
+
+
+def test_variants_share_the_canonical_key():
+    key = canonical_form(HARD_9)[0]
+    for seed in range(5):
+        variant = transform_puzzle(HARD, random.Random(seed))
+        assert canonical_form(variant.grid)[0] == key
+
+
+def test_solution_is_served_for_a_variant():
+    cache = SolutionCache()
+    cache.put(HARD_9, HARD_9_SOLUTION)
+    variant = transform_puzzle(HARD, random.Random(3))
+    solution = cache.get(variant.grid)
+    assert solution == variant.solution
+    assert validate_solution(solution, variant.grid) == (True, [])
+    assert cache.stats()["hits"] == 1
+
+
+def test_exact_grid_hit():
+    cache = SolutionCache()
+    cache.put(HARD_9, HARD_9_SOLUTION)
+    assert cache.get(HARD_9) == HARD_9_SOLUTION
+
+
+def test_unknown_grid_misses():
+    cache = SolutionCache()
+    cache.put(HARD_9, HARD_9_SOLUTION)
+    other = [row[:] for row in HARD_9]
+    other[0][0] = 0
+    assert cache.get(other) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_wrong_solution_is_rejected():
+    # Une solution qui ne respecte pas la grille demandée n'est jamais servie
+    cache = SolutionCache()
+    wrong = [row[:] for row in SOLVED_4]
+    wrong[0][2], wrong[0][3] = wrong[0][3], wrong[0][2]
+    cache.put(TWO_SOLUTIONS_4, wrong)
+    assert cache.get(TWO_SOLUTIONS_4) is None
+    assert cache.stats()["rejected"] == 1
+
+
+def test_lru_eviction():
+    cache = SolutionCache(max_entries=1)
+    cache.put(HARD_9, HARD_9_SOLUTION)
+    cache.put(TWO_SOLUTIONS_4, SOLVED_4)
+    assert len(cache) == 1
+    assert cache.get(HARD_9) is None
+    assert cache.get(TWO_SOLUTIONS_4) == SOLVED_4
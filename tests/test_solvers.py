@@ -0,0 +1,77 @@
+import pytest
+
+from app.sudoku import (
+    SOLVER_BACKENDS, VERIFY_SOLVED, VERIFY_TIMEOUT, VERIFY_UNSOLVABLE,
+    CancelToken, DancingLinksSolver, SolveCancelled, count_solutions,
+    solve_sudoku, verify_sudoku,
+)
+from grids import HARD_9, HARD_9_SOLUTION, SOLVED_4, TWO_SOLUTIONS_4, copy_grid
+
+
+@pytest.mark.parametrize("backend", sorted(SOLVER_BACKENDS))
+def test_backends_solve_known_hard_grid(backend):
+    board = copy_grid(HARD_9)
+    assert solve_sudoku(board, backend=backend)
+    assert board == HARD_9_SOLUTION
+
+
+def test_dlx_rejects_contradictory_grid():
+    board = copy_grid(HARD_9)
+    board[0][1] = 8  # Deux 8 sur la première ligne
+    assert not DancingLinksSolver(board).solve()
+
+
+def test_dlx_honours_cancel_token():
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(SolveCancelled):
+        DancingLinksSolver(copy_grid(HARD_9), None, token).solve()
+
+
+def test_unknown_backend_is_refused():
+    with pytest.raises(ValueError):
+        solve_sudoku(copy_grid(HARD_9), backend="nope")
+
+
+def test_count_solutions_unique_grid():
+    assert count_solutions(HARD_9, 2) == 1
+
+
+def test_count_solutions_two_solution_grid():
+    assert count_solutions(TWO_SOLUTIONS_4, 2) == 2
+    # Au-delà de la limite, le compte reste exact
+    assert count_solutions(TWO_SOLUTIONS_4, 5) == 2
+
+
+def test_count_solutions_stops_at_limit():
+    empty = [[0] * 4 for _ in range(4)]
+    assert count_solutions(empty, 10) == 10
+
+
+def test_count_solutions_leaves_board_untouched():
+    board = copy_grid(TWO_SOLUTIONS_4)
+    count_solutions(board, 2)
+    assert board == TWO_SOLUTIONS_4
+
+
+def test_count_solutions_contradictory_grid():
+    board = copy_grid(SOLVED_4)
+    board[0][0] = 0
+    board[0][1] = 1  # Le 1 de la ligne est déplacé : plus aucune solution
+    assert count_solutions(board, 2) == 0
+
+
+def test_verify_solved():
+    assert verify_sudoku(copy_grid(HARD_9)) == VERIFY_SOLVED
+
+
+def test_verify_unsolvable():
+    board = copy_grid(HARD_9)
+    board[0][1] = 8
+    assert verify_sudoku(board) == VERIFY_UNSOLVABLE
+
+
+def test_verify_timeout_is_not_unsolvable():
+    # Échéance déjà passée : la recherche s'interrompt sans conclure
+    empty = [[0] * 16 for _ in range(16)]
+    assert verify_sudoku(empty, timeout_seconds=-1) == VERIFY_TIMEOUT
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from app.sudoku import Puzzle, count_solutions, grade_puzzle, transform_puzzle, validate_solution
+from grids import HARD_9, HARD_9_SOLUTION
+
+
+@pytest.fixture
+def hard_puzzle():
+    return Puzzle(HARD_9, HARD_9_SOLUTION, "extreme", 9, grade=grade_puzzle(HARD_9))
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_transformed_puzzle_keeps_a_unique_solution(hard_puzzle, seed):
+    variant = transform_puzzle(hard_puzzle, random.Random(seed))
+    assert count_solutions(variant.grid, 2) == 1
+    # La solution transformée est celle de la grille transformée
+    assert validate_solution(variant.solution, variant.grid) == (True, [])
+
+
+def test_transform_keeps_clue_count_and_grade(hard_puzzle):
+    variant = transform_puzzle(hard_puzzle, random.Random(1))
+    clues = sum(1 for row in HARD_9 for v in row if v)
+    assert sum(1 for row in variant.grid for v in row if v) == clues
+    assert variant.grade == hard_puzzle.grade
+    assert variant.grade is not hard_puzzle.grade
+    assert (variant.difficulty, variant.size) == ("extreme", 9)
+    assert variant.id != hard_puzzle.id
+
+
+def test_transform_is_seeded(hard_puzzle):
+    first = transform_puzzle(hard_puzzle, random.Random(7))
+    second = transform_puzzle(hard_puzzle, random.Random(7))
+    assert first.grid == second.grid and first.solution == second.solution
+    assert hard_puzzle.grid == HARD_9  # Grille d'origine intacte
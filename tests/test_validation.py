@@ -0,0 +1,62 @@
+import pytest
+
+from app.sudoku import check_solution, validate_solution
+from grids import HARD_9, HARD_9_SOLUTION, SOLVED_4, TWO_SOLUTIONS_4, copy_grid
+
+
+def test_valid_solution():
+    assert validate_solution(HARD_9_SOLUTION, HARD_9) == (True, [])
+    assert check_solution(HARD_9_SOLUTION, HARD_9)
+
+
+def test_any_valid_solution_is_accepted():
+    # Grille à deux solutions : l'autre solution est aussi acceptée
+    other = copy_grid(SOLVED_4)
+    other[0][0], other[0][1] = 2, 1
+    other[2][0], other[2][1] = 1, 2
+    assert validate_solution(SOLVED_4, TWO_SOLUTIONS_4) == (True, [])
+    assert validate_solution(other, TWO_SOLUTIONS_4) == (True, [])
+
+
+def test_changed_given_is_reported():
+    user = copy_grid(HARD_9_SOLUTION)
+    user[0][0] = 9  # Indice 8 modifié (et 9 en double sur la ligne / la colonne / le bloc)
+    ok, conflicts = validate_solution(user, HARD_9)
+    assert not ok
+    assert [0, 0] in conflicts
+
+
+def test_duplicates_report_both_cells():
+    user = copy_grid(HARD_9_SOLUTION)
+    user[0][1], user[0][2] = user[0][2], user[0][1]  # Cases non données échangées
+    ok, conflicts = validate_solution(user, HARD_9)
+    assert not ok
+    assert [0, 1] in conflicts and [0, 2] in conflicts
+    assert conflicts == sorted(conflicts)
+
+
+def test_incomplete_grid_is_not_valid():
+    user = copy_grid(HARD_9_SOLUTION)
+    user[4][0] = 0
+    user[1][0] = 0
+    assert validate_solution(user, HARD_9) == (False, [])
+
+
+@pytest.mark.parametrize("user", [
+    None,
+    "123",
+    [],
+    HARD_9_SOLUTION[:8],
+    [row[:8] for row in HARD_9_SOLUTION],
+    [tuple(row) for row in HARD_9_SOLUTION],
+])
+def test_malformed_grid_is_refused(user):
+    assert validate_solution(user, HARD_9) == (False, [])
+
+
+def test_non_integer_values_are_refused():
+    user = [[str(v) for v in row] for row in HARD_9_SOLUTION]
+    ok, conflicts = validate_solution(user, HARD_9)
+    assert not ok
+    # Les indices effacés (ici remplacés par du texte) sont signalés
+    assert [0, 0] in conflicts